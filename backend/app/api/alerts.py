@@ -1,16 +1,81 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.db import get_db
-from app.models.database import User, Alert
+import base64
+import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.db import get_async_db
+from app.models.database import Alert
 from app.schemas.schemas import AlertResponse
+from app.services.identity import get_identity_resolver
 
 router = APIRouter()
+settings = get_settings()
+identity_resolver = get_identity_resolver()
+
+
+def to_naive_utc(value: datetime.datetime) -> datetime.datetime:
+    """Convert an aware datetime to naive UTC, matching `Alert.created_at` (naive values pass through)"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def encode_cursor(alert: Alert) -> str:
+    """Opaque keyset cursor pointing just past an alert in (created_at, id) order"""
+    raw = f"{alert.created_at.isoformat()}|{alert.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Parse a cursor produced by `encode_cursor`.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        created_at, alert_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+        return to_naive_utc(datetime.datetime.fromisoformat(created_at)), int(alert_id)
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 
 @router.get("/", response_model=list[AlertResponse])
-async def get_alerts(email: str, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == email).first()
+async def get_alerts(
+    email: str,
+    response: Response,
+    before: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    limit: int = Query(settings.alerts_page_size, ge=1, le=settings.alerts_max_page_size),
+    severity: Optional[str] = Query(None, description="Info, Warning or Critical"),
+    type: Optional[str] = Query(None, description="Weather, Pest or Stage"),
+    since: Optional[datetime.datetime] = Query(None, description="Only alerts created after this time (for polling)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Newest-first page of a farm's alerts.
+    When more alerts exist, the cursor for the next page is returned in the
+    `X-Next-Cursor` response header.
+    """
+    user = await identity_resolver.resolve(db, email)
     if not user or not user.farm_profile:
         return []
-        
-    alerts = db.query(Alert).filter(Alert.farm_id == user.farm_profile.id).order_by(Alert.created_at.desc()).all()
+    farm_id = user.farm_profile.id
+
+    statement = select(Alert).where(Alert.farm_id == farm_id)
+    if severity:
+        statement = statement.where(Alert.severity == severity)
+    if type:
+        statement = statement.where(Alert.type == type)
+    if since:
+        statement = statement.where(Alert.created_at > to_naive_utc(since))
+    if before:
+        statement = statement.where(tuple_(Alert.created_at, Alert.id) < decode_cursor(before))
+
+    # Fetch one extra row to learn whether another page exists
+    alerts = (await db.scalars(statement.order_by(Alert.created_at.desc(), Alert.id.desc()).limit(limit + 1))).all()
+    if len(alerts) > limit:
+        alerts = alerts[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(alerts[-1])
     return alerts
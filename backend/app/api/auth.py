@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import get_async_db
 from app.models.database import User
 from pydantic import BaseModel
 
@@ -12,9 +13,9 @@ class UserLogin(BaseModel):
     uid: str
 
 @router.post("/login")
-async def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(user_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
     # Check if user exists by email
-    user = db.query(User).filter(User.email == user_data.email).first()
+    user = await db.scalar(select(User).where(User.email == user_data.email))
     
     if not user:
         # Create new user if they don't exist
@@ -23,8 +24,8 @@ async def login(user_data: UserLogin, db: Session = Depends(get_db)):
             name=user_data.name
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
     
     return {
         "message": "Login successful",
@@ -1,19 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db import get_db
-from app.models.database import User, FarmProfile
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import get_async_db
 from app.schemas.schemas import ChatQuery, ChatResponse
 from app.services.agents.farming_agents import FarmingAgents
-from app.services.rag.rag_service import RAGService
+from app.services.rag import get_rag_service
 from app.services.weather import get_weather_service
+from app.services.metrics import metrics
+from app.services.identity import get_identity_resolver
+import json
+import time
 
 router = APIRouter()
-rag_service = RAGService()
+rag_service = get_rag_service()
 weather_service = get_weather_service()
+identity_resolver = get_identity_resolver()
 
-@router.post("/query")
-async def chat_query(data: ChatQuery, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == data.user_email).first()
+DEFAULT_ACTIONABLE_STEPS = ["Check soil moisture", "Review irrigation"]
+
+async def build_chat_context(data: ChatQuery, db: AsyncSession) -> dict:
+    """Resolve the farmer and gather stage, knowledge and weather context for a question"""
+    user = await identity_resolver.resolve(db, data.user_email)
     if not user or not user.farm_profile:
         raise HTTPException(status_code=404, detail="Farm profile not found.")
 
@@ -29,14 +36,63 @@ async def chat_query(data: ChatQuery, db: Session = Depends(get_db)):
     weather_data = await weather_service.get_weather(farm.latitude, farm.longitude)
     weather_context = f"{weather_data['condition']}, {weather_data['temperature']}°C"
 
-    # Reasoning loop
-    raw_answer = await FarmingAgents.action_planner(effective_stage, weather_context, knowledge, data.question)
-    
-    # Translate to farmer's language
-    final_answer = await FarmingAgents.translate_to_language(raw_answer, user.preferred_language)
+    return {
+        "stage": effective_stage,
+        "weather": weather_context,
+        "knowledge": knowledge,
+        "language": user.preferred_language
+    }
+
+@router.post("/query")
+async def chat_query(data: ChatQuery, db: AsyncSession = Depends(get_async_db)):
+    context = await build_chat_context(data, db)
+
+    # Reasoning loop, answered in the farmer's language
+    final_answer = await FarmingAgents.plan_advice(context["stage"], context["weather"], context["knowledge"], data.question, context["language"])
 
     return ChatResponse(
         answer=final_answer,
         stage="Determined by Agent",
-        actionable_steps=["Check soil moisture", "Review irrigation"]
+        actionable_steps=DEFAULT_ACTIONABLE_STEPS
+    )
+
+def format_sse(event: str, payload: dict) -> str:
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+@router.post("/query/stream")
+async def chat_query_stream(data: ChatQuery, db: AsyncSession = Depends(get_async_db)):
+    """
+    Streaming variant of /chat/query over Server-Sent Events.
+    Emits `token` events as the answer is generated and a final `done` event
+    carrying the full answer, `stage` and `actionable_steps`.
+    """
+    started = time.perf_counter()
+    context = await build_chat_context(data, db)
+
+    async def event_stream():
+        parts = []
+        try:
+            async for delta in FarmingAgents.stream_advice(context["stage"], context["weather"], context["knowledge"], data.question, context["language"]):
+                if not parts:
+                    metrics.observe("chat_stream.time_to_first_token", time.perf_counter() - started)
+                parts.append(delta)
+                yield format_sse("token", {"text": delta})
+        except Exception as e:
+            print(f"Chat stream error: {e}")
+            metrics.incr("chat_stream.errors")
+            yield format_sse("error", {"detail": "Failed to generate answer"})
+            return
+
+        metrics.observe("chat_stream.total", time.perf_counter() - started)
+        yield format_sse("done", ChatResponse(
+            answer="".join(parts),
+            stage="Determined by Agent",
+            actionable_steps=DEFAULT_ACTIONABLE_STEPS
+        ).model_dump())
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
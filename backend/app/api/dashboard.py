@@ -1,28 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db import get_db
-from app.models.database import User, FarmProfile, FarmState, AdviceHistory
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import get_async_db
 from app.schemas.schemas import DashboardSummaryResponse, WeatherResponse, UserInfoResponse
 from app.services.agents.farming_agents import FarmingAgents
-from app.services.rag.rag_service import RAGService
+from app.services.agents.daily_advice import daily_weather_bucket, get_precomputed_advice
+from app.services.rag import get_rag_service
 from app.services.weather import get_weather_service
 from app.config import get_settings
 from app.services.crop_config_loader import get_crop_loader
+from app.services.identity import get_identity_resolver
+from app.services.write_behind import get_write_buffer
+from app.services.response_cache import get_response_cache
 import datetime
 
 router = APIRouter()
 settings = get_settings()
-rag_service = RAGService()
+rag_service = get_rag_service()
 weather_service = get_weather_service()
+identity_resolver = get_identity_resolver()
+write_buffer = get_write_buffer()
+response_cache = get_response_cache()
 
 @router.get("/summary")
-async def get_dashboard_summary(email: str, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == email).first()
+async def get_dashboard_summary(email: str, db: AsyncSession = Depends(get_async_db)):
+    user = await identity_resolver.resolve(db, email)
     if not user or not user.farm_profile:
         raise HTTPException(status_code=404, detail="Farm profile not found. Please onboard first.")
     
     farm = user.farm_profile
-    state = db.query(FarmState).filter(FarmState.farm_id == farm.id).first()
     
     # Refresh stage detection using crop-specific config
     current_stage = FarmingAgents.get_crop_stage(farm.sowing_date, farm.crop_type)
@@ -32,33 +37,30 @@ async def get_dashboard_summary(email: str, db: Session = Depends(get_db)):
     weather_data = await weather_service.get_weather(farm.latitude, farm.longitude)
     weather_context = f"{weather_data['condition']}, {weather_data['temperature']}°C"
     
-    # Get knowledge for the planner
-    if settings.enable_rag:
-        knowledge = await rag_service.get_relevant_advice(farm.crop_type, current_stage)
-    else:
-        knowledge = f"Standard agricultural practices for {farm.crop_type} at {current_stage} stage."
-    
-    # Agent Brain: Plan today's action
-    raw_advice = await FarmingAgents.action_planner(current_stage, weather_context, knowledge)
-    
-    # Multilingual translation
-    final_advice = await FarmingAgents.translate_to_language(raw_advice, user.preferred_language)
-    
-    # Persist advice history
-    advice_entry = AdviceHistory(
-        farm_id=farm.id,
-        recommendation=final_advice,
-        stage_at_time=current_stage,
-        weather_summary=weather_context
-    )
-    db.add(advice_entry)
-    
-    # Update state
-    if state:
-        state.current_stage = current_stage
-        state.day_count = day_count
-        state.last_action = final_advice
-    db.commit()
+    # Serve the nightly precomputed advice for this farm's group when available
+    language = user.preferred_language or settings.default_language
+    bucket = await daily_weather_bucket(farm.latitude, farm.longitude)
+    final_advice = await get_precomputed_advice(db, farm.crop_type, current_stage, bucket, language)
+    
+    if final_advice is None:
+        # Get knowledge for the planner
+        if settings.enable_rag:
+            knowledge = await rag_service.get_relevant_advice(farm.crop_type, current_stage)
+        else:
+            knowledge = f"Standard agricultural practices for {farm.crop_type} at {current_stage} stage."
+        
+        # Agent Brain: Plan today's action in the farmer's language
+        final_advice = await FarmingAgents.plan_advice(current_stage, weather_context, knowledge, target_lang=language)
+    
+    # Persist advice history and update state in the background (batched write-behind)
+    write_buffer.add_advice(farm.id, final_advice, current_stage, weather_context, email=email)
+    if farm.state_id is not None:
+        write_buffer.update_farm_state(
+            farm.state_id,
+            current_stage=current_stage,
+            day_count=day_count,
+            last_action=final_advice
+        )
     
     # Calculate progress using crop-specific total days
     crop_loader = get_crop_loader(settings.crop_config_path)
@@ -74,9 +76,13 @@ async def get_dashboard_summary(email: str, db: Session = Depends(get_db)):
 
 
 @router.get("/weather", response_model=WeatherResponse)
-async def get_weather(email: str, db: Session = Depends(get_db)):
+async def get_weather(email: str, request: Request, db: AsyncSession = Depends(get_async_db)):
     """Get weather data for the user's farm location using real weather API"""
-    user = db.query(User).filter(User.email == email).first()
+    cached, cache_version = await response_cache.get("dashboard_weather", email)
+    if cached is not None:
+        return cached.to_response(request)
+    
+    user = await identity_resolver.resolve(db, email)
     
     if not user or not user.farm_profile:
         raise HTTPException(status_code=404, detail="User not found or no farm profile")
@@ -86,13 +92,15 @@ async def get_weather(email: str, db: Session = Depends(get_db)):
     # Get weather using real API (or mock if not configured)
     weather_data = await weather_service.get_weather(farm.latitude, farm.longitude)
     
-    return WeatherResponse(**weather_data)
+    # Never outlive the weather cache entry the response was built from
+    weather = WeatherResponse(**weather_data)
+    return response_cache.put("dashboard_weather", email, cache_version, weather, ttl=settings.weather_cache_ttl).to_response(request)
 
 
 @router.get("/user-info", response_model=UserInfoResponse)
-async def get_user_info(email: str, db: Session = Depends(get_db)):
+async def get_user_info(email: str, db: AsyncSession = Depends(get_async_db)):
     """Get user info for dashboard greeting"""
-    user = db.query(User).filter(User.email == email).first()
+    user = await identity_resolver.resolve(db, email)
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
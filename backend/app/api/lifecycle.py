@@ -1,58 +1,73 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.db import get_db
-from app.models.database import User, FarmState, AdviceHistory, FarmTask
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import get_async_db
+from app.models.database import FarmProfile, AdviceHistory, FarmTask
 from app.schemas.schemas import LifecycleStageResponse, LifecycleStatusResponse, ToggleTaskRequest
 from app.services.agents.farming_agents import FarmingAgents
+from app.services.agents.stage_summary_cache import get_stage_summary_cache
 from app.config import get_settings
 from app.services.crop_config_loader import get_crop_loader
 from app.services.weather import get_weather_service
-from typing import List
+from app.services.farm_tasks import ensure_default_tasks
+from app.services.identity import get_identity_resolver
+from app.services.response_cache import get_response_cache
+from typing import List, Optional
+import asyncio
 import datetime
 
 router = APIRouter()
 settings = get_settings()
 weather_service = get_weather_service()
-
-DEFAULT_TASKS = {
-    "planning": ["Soil testing", "Seed selection", "Field preparation"],
-    "sowing": ["Seeds sown at optimal depth", "Initial irrigation", "Germination monitoring"],
-    "germination": ["Seedling emergence monitoring", "Moisture check", "Early pest inspection"],
-    "transplanting": ["Soil saturation", "Seedling selection", "Careful transplanting", "Initial post-transplant irrigation"],
-    "vegetative": ["First nitrogen application", "Weed control", "Second nitrogen application", "Pest monitoring"],
-    "growth": ["First nitrogen application", "Weed control", "Second nitrogen application", "Pest monitoring"],
-    "emergence": ["Stand count evaluation", "Moisture monitoring", "Early weed control"],
-    "tillering": ["Nitrogen top-dressing", "Irrigation management", "Weed monitoring"],
-    "stem_elongation": ["Water stress management", "Foliar nutrient spray", "Stem borer inspection"],
-    "flowering": ["Micronutrient spray", "Irrigation management", "Disease monitoring"],
-    "ripening": ["Wait for grain filling", "Late-stage moisture monitoring", "Bird protection"],
-    "boll_development": ["Pest control (Bollworms)", "Potash application", "Moisture management"],
-    "maturation": ["Sugar content check (Degrees Brix)", "Irrigation withdrawal", "Pre-harvest planning"],
-    "harvest": ["Harvest readiness check", "Equipment preparation", "Harvest and storage"]
-}
-
-def calculate_stage_status(stage: dict, day_count: int) -> str:
-    """Determine if a stage is completed, current, or upcoming"""
-    if day_count >= stage["end_day"]:
-        return "completed"
-    elif day_count >= stage["start_day"]:
-        return "current"
-    else:
-        return "upcoming"
+stage_summary_cache = get_stage_summary_cache()
+identity_resolver = get_identity_resolver()
+response_cache = get_response_cache()
 
 def format_stage_date(sowing_date: datetime.date, day_offset: int) -> str:
     """Format a date based on sowing date and day offset"""
     stage_date = sowing_date + datetime.timedelta(days=day_offset)
     return stage_date.strftime("%b %d")
 
+async def generate_stage_summary(crop_type: str, stage_label: str, language: str, limiter: asyncio.Semaphore) -> str:
+    """Generate the brief per-stage AI summary shown on the timeline"""
+    async with limiter:
+        knowledge = settings.stage_summary_knowledge_template.format(crop=crop_type, stage=stage_label)
+        return await FarmingAgents.plan_advice(stage_label, "Normal", knowledge, settings.stage_summary_query, language)
+
+async def generate_next_summary(farm, stage_label: Optional[str], language: str, limiter: asyncio.Semaphore) -> Optional[str]:
+    """Generate the weather-aware "What's Next" summary for the current stage"""
+    if not stage_label:
+        return None
+    
+    weather_data = await weather_service.get_weather(farm.latitude, farm.longitude)
+    weather_context = f"{weather_data['condition']}, {weather_data['temperature']}°C"
+    
+    async with limiter:
+        # Knowledge context for the planner
+        knowledge = f"Farming practices for {farm.crop_type} at {stage_label} stage."
+        
+        # Get AI recommendation
+        return await FarmingAgents.plan_advice(stage_label, weather_context, knowledge, "What should I do next in this stage?", language)
+
 @router.get("/status", response_model=LifecycleStatusResponse)
-async def get_lifecycle_status(email: str, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == email).first()
+async def get_lifecycle_status(email: str, request: Request, db: AsyncSession = Depends(get_async_db)):
+    # Repeat polls are served from the response cache (304 when the ETag matches)
+    cached, cache_version = await response_cache.get("lifecycle_status", email)
+    if cached is not None:
+        return cached.to_response(request)
+    
+    user = await identity_resolver.resolve(db, email)
     if not user or not user.farm_profile:
         raise HTTPException(status_code=404, detail="Farm profile not found")
         
     farm = user.farm_profile
-    history = db.query(AdviceHistory).filter(AdviceHistory.farm_id == farm.id).all()
+    # Newest entries via the (farm_id, created_at) index, shown oldest first
+    recent_history = (await db.scalars(
+        select(AdviceHistory.recommendation)
+        .where(AdviceHistory.farm_id == farm.id)
+        .order_by(AdviceHistory.created_at.desc(), AdviceHistory.id.desc())
+        .limit(settings.lifecycle_history_limit)
+    )).all()
     
     # Calculate day count from sowing
     day_count = (datetime.date.today() - farm.sowing_date).days
@@ -63,32 +78,20 @@ async def get_lifecycle_status(email: str, db: Session = Depends(get_db)):
     CROP_STAGES = crop_config['stages']
     total_days = crop_config['total_days']
     
-    # Fetch existing tasks
-    existing_tasks = db.query(FarmTask).filter(FarmTask.farm_id == farm.id).all()
-    tasks_by_stage = {}
-    for task in existing_tasks:
-        if task.stage_id not in tasks_by_stage:
-            tasks_by_stage[task.stage_id] = []
-        tasks_by_stage[task.stage_id].append(task)
+    # Tasks are seeded at onboarding; older farms get any missing stages in one bulk insert
+    tasks_by_stage = await ensure_default_tasks(db, farm.id, [stage["id"] for stage in CROP_STAGES])
     
     # Build timeline with proper statuses and tasks
     timeline = []
     current_stage_name = None
     current_stage_id = None
     
-    for stage in CROP_STAGES:
-        status = calculate_stage_status(stage, day_count)
+    # Completed / current / upcoming for every stage in one vectorized pass
+    statuses = crop_loader.get_stage_statuses(farm.crop_type, day_count)
+    for stage, status in zip(CROP_STAGES, statuses):
         stage_id = stage["id"]
         
-        # Initialize tasks if they don't exist for this stage
         stage_tasks = tasks_by_stage.get(stage_id, [])
-        if not stage_tasks and stage_id in DEFAULT_TASKS:
-            for task_name in DEFAULT_TASKS[stage_id]:
-                new_task = FarmTask(farm_id=farm.id, stage_id=stage_id, task_name=task_name, is_completed=False)
-                db.add(new_task)
-            db.commit()
-            # Re-fetch tasks after commit
-            stage_tasks = db.query(FarmTask).filter(FarmTask.farm_id == farm.id, FarmTask.stage_id == stage_id).all()
         
         # Format the date display
         if status == "completed":
@@ -100,66 +103,69 @@ async def get_lifecycle_status(email: str, db: Session = Depends(get_db)):
         else:
             date_display = format_stage_date(farm.sowing_date, stage["start_day"])
         
-        # Get AI Summary for each stage (briefly)
-        knowledge = f"Farming practices for {farm.crop_type} at {stage['label']} stage."
-        raw_stage_ai = await FarmingAgents.action_planner(stage['label'], "Normal", knowledge, "Provide one sentence of key advice for this stage.")
-        stage_ai_summary = await FarmingAgents.translate_to_language(raw_stage_ai, user.preferred_language)
-
         timeline.append({
             "id": stage_id,
             "label": stage["label"],
             "status": status,
             "date": date_display,
             "tasks": [{"id": t.id, "task_name": t.task_name, "is_completed": t.is_completed} for t in stage_tasks],
-            "ai_summary": stage_ai_summary
+            "ai_summary": None
         })
     
-    # Generate AI Summary for "What's Next"
-    ai_summary = None
-    if current_stage_name:
-        weather_data = await weather_service.get_weather(farm.latitude, farm.longitude)
-        weather_context = f"{weather_data['condition']}, {weather_data['temperature']}°C"
-        
-        # Knowledge context for the planner
-        knowledge = f"Farming practices for {farm.crop_type} at {current_stage_name} stage."
-        
-        # Get AI recommendation
-        raw_ai = await FarmingAgents.action_planner(current_stage_name, weather_context, knowledge, "What should I do next in this stage?")
-        ai_summary = await FarmingAgents.translate_to_language(raw_ai, user.preferred_language)
+    # Stage summaries are farm-independent, so most come from the shared cache
+    cached_summaries = await stage_summary_cache.get_many(db, farm.crop_type, user.preferred_language, [entry["id"] for entry in timeline])
+    pending = [entry for entry in timeline if entry["id"] not in cached_summaries]
+    
+    # Generate missing stage summaries and the "What's Next" summary concurrently.
+    # gather() returns results in submission order, so the timeline stays aligned.
+    limiter = asyncio.Semaphore(settings.lifecycle_summary_concurrency)
+    summaries = await asyncio.gather(
+        *[generate_stage_summary(farm.crop_type, entry["label"], user.preferred_language, limiter) for entry in pending],
+        generate_next_summary(farm, current_stage_name, user.preferred_language, limiter)
+    )
+    generated = {entry["id"]: stage_ai_summary for entry, stage_ai_summary in zip(pending, summaries)}
+    await stage_summary_cache.put_many(db, farm.crop_type, user.preferred_language, generated)
+    
+    for entry in timeline:
+        entry["ai_summary"] = cached_summaries.get(entry["id"], generated.get(entry["id"]))
+    ai_summary = summaries[-1]
     
     # Calculate progress
     progress_percentage = crop_loader.calculate_progress_percentage(farm.crop_type, day_count)
     
-    return {
-        "crop": farm.crop_type,
-        "sowing_date": farm.sowing_date,
-        "day_count": day_count,
-        "current_stage": current_stage_name or "Unknown",
-        "total_days": total_days,
-        "progress_percentage": progress_percentage,
-        "timeline": timeline,
-        "ai_summary": ai_summary,
-        "history": [h.recommendation for h in history[-5:]]
-    }
+    status = LifecycleStatusResponse(
+        crop=farm.crop_type,
+        sowing_date=farm.sowing_date,
+        day_count=day_count,
+        current_stage=current_stage_name or "Unknown",
+        total_days=total_days,
+        progress_percentage=progress_percentage,
+        timeline=timeline,
+        ai_summary=ai_summary,
+        history=list(reversed(recent_history))
+    )
+    return response_cache.put("lifecycle_status", email, cache_version, status).to_response(request)
 
 @router.post("/toggle-task")
-async def toggle_task(data: ToggleTaskRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == data.user_email).first()
+async def toggle_task(data: ToggleTaskRequest, db: AsyncSession = Depends(get_async_db)):
+    user = await identity_resolver.resolve(db, data.user_email)
     if not user or not user.farm_profile:
         raise HTTPException(status_code=404, detail="Farm profile not found")
     
-    task = db.query(FarmTask).filter(FarmTask.id == data.task_id, FarmTask.farm_id == user.farm_profile.id).first()
+    task = await db.scalar(select(FarmTask).where(FarmTask.id == data.task_id, FarmTask.farm_id == user.farm_profile.id))
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
     task.is_completed = not task.is_completed
-    db.commit()
+    await db.commit()
+    await response_cache.invalidate(data.user_email)
     
     return {"status": "success", "is_completed": task.is_completed}
 
 @router.post("/advance-stage")
-async def advance_stage(user_email: str, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == user_email).first()
+async def advance_stage(user_email: str, db: AsyncSession = Depends(get_async_db)):
+    # The new sowing date is computed from the current one, so never start from a cached snapshot
+    user = await identity_resolver.resolve(db, user_email, fresh=True)
     if not user or not user.farm_profile:
         raise HTTPException(status_code=404, detail="Farm profile not found")
     
@@ -168,22 +174,24 @@ async def advance_stage(user_email: str, db: Session = Depends(get_db)):
     
     # Load crop stages
     crop_loader = get_crop_loader(settings.crop_config_path)
-    crop_config = crop_loader.get_crop_config(farm.crop_type)
-    CROP_STAGES = crop_config['stages']
+    compiled = crop_loader.get_compiled(farm.crop_type)
     
-    # Find current stage end day
+    # Find current stage end day (none once past the last stage)
     current_stage_end = None
-    for stage in CROP_STAGES:
-        if day_count >= stage["start_day"] and day_count < stage["end_day"]:
-            current_stage_end = stage["end_day"]
-            break
+    stage_index = compiled.stage_index(day_count)
+    if stage_index >= 0 and day_count < compiled.ends[stage_index]:
+        current_stage_end = int(compiled.ends[stage_index])
     
     if current_stage_end is not None:
         # Shift sowing date back so today is at the beginning of the next stage
         # New day count should be current_stage_end
         days_to_add = current_stage_end - day_count
-        farm.sowing_date = farm.sowing_date - datetime.timedelta(days=days_to_add)
-        db.commit()
+        await db.execute(update(FarmProfile).where(FarmProfile.id == farm.id).values(
+            sowing_date=farm.sowing_date - datetime.timedelta(days=days_to_add)
+        ))
+        await db.commit()
+        identity_resolver.invalidate(user_email)
+        await response_cache.invalidate(user_email)
         return {"status": "success", "new_day_count": current_stage_end}
     
     return {"status": "already_at_latest", "day_count": day_count}
@@ -1,19 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import get_async_db
 from app.models.database import User, FarmProfile, FarmState, AdviceHistory
 from app.schemas.schemas import OnboardingRequest, UserResponse
 from app.services.agents.farming_agents import FarmingAgents
 from app.config import get_settings
+from app.services.crop_config_loader import get_crop_loader
+from app.services.farm_tasks import seed_default_tasks
+from app.services.identity import get_identity_resolver
+from app.services.response_cache import get_response_cache
 import datetime
 
 router = APIRouter()
 settings = get_settings()
+identity_resolver = get_identity_resolver()
+response_cache = get_response_cache()
 
 @router.post("/setup")
-async def setup_onboarding(data: OnboardingRequest, db: Session = Depends(get_db)):
+async def setup_onboarding(data: OnboardingRequest, db: AsyncSession = Depends(get_async_db)):
     # Find or create user
-    user = db.query(User).filter(User.email == data.user_email).first()
+    user = await db.scalar(select(User).where(User.email == data.user_email))
     if not user:
         user = User(
             email=data.user_email,
@@ -21,8 +28,8 @@ async def setup_onboarding(data: OnboardingRequest, db: Session = Depends(get_db
             preferred_language=data.preferred_language
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
 
     # Create farm profile
     farm = FarmProfile(
@@ -36,8 +43,8 @@ async def setup_onboarding(data: OnboardingRequest, db: Session = Depends(get_db
         longitude=data.longitude
     )
     db.add(farm)
-    db.commit()
-    db.refresh(farm)
+    await db.commit()
+    await db.refresh(farm)
 
     # Initialize farm state
     stage = FarmingAgents.get_crop_stage(data.sowing_date, data.crop)
@@ -48,6 +55,20 @@ async def setup_onboarding(data: OnboardingRequest, db: Session = Depends(get_db
         last_action=f"Initial setup completed. Welcome to {settings.app_name}!"
     )
     db.add(farm_state)
-    db.commit()
+    await db.commit()
+
+    # Seed the default task checklist for every stage so lifecycle reads never write.
+    # The profile is already committed, so cached snapshots are dropped even if seeding fails.
+    try:
+        crop_loader = get_crop_loader(settings.crop_config_path)
+        try:
+            stage_ids = [stage["id"] for stage in crop_loader.get_crop_stages(data.crop)]
+        except ValueError:
+            stage_ids = []  # Crop not in the crop config: no stages to seed
+        if stage_ids:
+            await seed_default_tasks(db, farm.id, stage_ids)
+    finally:
+        identity_resolver.invalidate(data.user_email)
+        await response_cache.invalidate(data.user_email)
 
     return {"message": "Onboarding successful", "farm_id": farm.id}
@@ -1,16 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.db import get_async_db
 from app.models.database import User, FarmProfile
 from app.schemas.schemas import UserProfileResponse, UserProfileUpdate
+from app.services.identity import get_identity_resolver
+from app.services.response_cache import get_response_cache
 from pydantic import EmailStr
 
 router = APIRouter()
+identity_resolver = get_identity_resolver()
+response_cache = get_response_cache()
 
 @router.get("/profile", response_model=UserProfileResponse)
-async def get_user_profile(email: str, db: Session = Depends(get_db)):
+async def get_user_profile(email: str, request: Request, db: AsyncSession = Depends(get_async_db)):
     """Get complete user profile including farm details"""
-    user = db.query(User).filter(User.email == email).first()
+    cached, cache_version = await response_cache.get("user_profile", email)
+    if cached is not None:
+        return cached.to_response(request)
+    
+    user = await identity_resolver.resolve(db, email)
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -40,13 +50,14 @@ async def get_user_profile(email: str, db: Session = Depends(get_db)):
             "has_farm_profile": True
         })
     
-    return UserProfileResponse(**response_data)
+    profile = UserProfileResponse(**response_data)
+    return response_cache.put("user_profile", email, cache_version, profile).to_response(request)
 
 
 @router.put("/profile")
-async def update_user_profile(data: UserProfileUpdate, db: Session = Depends(get_db)):
+async def update_user_profile(data: UserProfileUpdate, db: AsyncSession = Depends(get_async_db)):
     """Update user profile (name, location, language)"""
-    user = db.query(User).filter(User.email == data.email).first()
+    user = await db.scalar(select(User).options(selectinload(User.farm_profile)).where(User.email == data.email))
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -66,7 +77,8 @@ async def update_user_profile(data: UserProfileUpdate, db: Session = Depends(get
         if data.village is not None:
             user.farm_profile.village = data.village
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    identity_resolver.invalidate(data.email)
+    await response_cache.invalidate(data.email)
     
     return {"message": "Profile updated successfully", "email": user.email}
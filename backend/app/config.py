@@ -19,6 +19,7 @@ class Settings(BaseSettings):
     
     # ===== DATABASE CONFIGURATION =====
     database_url: str  # Required, no default
+    async_database_url: Optional[str] = None  # Defaults to DATABASE_URL with its async driver (asyncpg/aiosqlite)
     db_table_users: str = "users"
     db_table_farm_profiles: str = "farm_profiles"
     db_table_farm_states: str = "farm_states"
@@ -26,6 +27,13 @@ class Settings(BaseSettings):
     db_table_alerts: str = "alerts"
     db_pool_size: int = 5
     db_max_overflow: int = 10
+    alerts_page_size: int = 50  # Default number of alerts per page
+    alerts_max_page_size: int = 200  # Upper bound for the `limit` query parameter
+    lifecycle_history_limit: int = 5  # Recent advice entries returned by /lifecycle/status
+    write_behind_batch_size: int = 200  # Flush queued dashboard writes at this many pending rows
+    write_behind_flush_interval: float = 2.0  # ...or after this many seconds
+    write_behind_max_pending: int = 10000  # Writes beyond this are dropped (and counted) if the DB falls behind
+    write_behind_max_attempts: int = 3  # A row failing this many flushes is dropped and logged
     
     # ===== SERVICE CONFIGURATION =====
     app_host: str = "0.0.0.0"
@@ -47,22 +55,98 @@ class Settings(BaseSettings):
     groq_translation_temperature: float = 0.1
     groq_max_tokens: int = 2048
     groq_top_p: float = 1.0
+    groq_timeout: float = 30.0  # Seconds per LLM request
+    groq_max_retries: int = 2
+    groq_max_concurrency: int = 8  # Max in-flight LLM calls per worker
+    llm_advice_mode: str = "two_pass"  # two_pass (plan in English, then translate) or single_pass (plan in target language)
+    lifecycle_summary_concurrency: int = 8  # Parallel stage summaries per /lifecycle/status request
     
-    # ===== RAG CONFIGURATION (PINECONE) =====
-    pinecone_api_key: str  # Required
+    # ===== RAG CONFIGURATION =====
+    rag_backend: str = "local"  # local (in-process NumPy index) or pinecone
+    rag_embedding_model: str = "hashing"  # hashing (CPU, no model download) or a sentence-transformers model name
+    rag_embedding_dimension: int = 384  # Vector size of the hashing embedder with the local backend
+    rag_index_mode: str = "brute"  # brute (exact) or ivf (clustered, for large corpora)
+    rag_ivf_lists: int = 64  # IVF clusters
+    rag_ivf_probes: int = 8  # IVF clusters scanned per query
+    rag_corpus_path: Optional[str] = None  # Extra JSON Lines documents ({"id", "text", "crop", "stage"})
+    enable_rag_cache: bool = True  # Cache query embeddings and retrieval results per index version
+    rag_embedding_cache_max_entries: int = 5000  # Query embeddings kept per worker
+    rag_embedding_cache_ttl: int = 86400  # Seconds a query embedding is reused
+    rag_result_cache_max_entries: int = 5000  # Retrieval results kept per worker
+    rag_result_cache_ttl: int = 3600  # Seconds retrieval results are reused (re-ingest invalidates sooner)
+    rag_index_version_check_interval: int = 30  # Seconds between checks for a newly ingested remote index version
+    pinecone_api_key: Optional[str] = None  # Required for RAG_BACKEND=pinecone
     pinecone_index: str = "cropmind"
-    pinecone_host: Optional[str] = None  # Required for Pinecone
+    pinecone_host: Optional[str] = None  # Required for RAG_BACKEND=pinecone
     pinecone_dimension: int = 1536
-    pinecone_top_k: int = 3
+    pinecone_top_k: int = 3  # Passages retrieved per query (all backends)
     
     # ===== CROP CONFIGURATION =====
     crop_config_path: str = "app/config/crop_config.yaml"
+    enable_crop_config_reload: bool = True  # Watch the YAML and swap in edits without a restart
+    crop_config_reload_interval: int = 10  # Seconds between file modification checks
+    enable_crop_config_snapshot: bool = True  # Start from a compiled snapshot instead of parsing YAML
+    crop_config_snapshot_path: Optional[str] = None  # Defaults to <crop_config_path>.compiled.pkl
     
     # ===== WEATHER API CONFIGURATION =====
     weather_api_provider: str = "openweathermap"
     weather_api_key: Optional[str] = None  # Optional, falls back to mock if not provided
     weather_api_endpoint: str = "https://api.openweathermap.org/data/2.5"
     weather_cache_ttl: int = 1800  # 30 minutes in seconds
+    weather_grid_resolution: float = 0.05  # Degrees (~5.5 km); farms in one cell share weather
+    weather_cache_max_entries: int = 50000  # Grid cells kept per worker
+    weather_forecast_ttl: int = 10800  # 3 hours in seconds (provider updates every 3h)
+    weather_forecast_max_entries: int = 20000  # Forecast series kept per worker
+    weather_rain_probability_threshold: float = 0.5  # Forecast pop that counts as "rain expected"
+    weather_api_rate_limit_per_minute: int = 60  # Per worker: set to the provider quota divided by the worker count
+    weather_api_burst: int = 10
+    weather_api_reserve: int = 3  # Tokens the warmer leaves for live requests
+    weather_http_timeout: float = 10.0  # Seconds per provider request
+    weather_http_max_connections: int = 20  # Pooled connections to the provider, per worker
+    weather_http_max_keepalive: int = 10  # Idle keep-alive connections retained
+    weather_http_keepalive_expiry: float = 30.0  # Seconds an idle connection is kept open
+    weather_http2: bool = False  # Requires the optional `h2` package
+    
+    # ===== CACHE CONFIGURATION =====
+    cache_backend: str = "memory"  # memory, redis, or fakeredis (local testing)
+    redis_url: str = "redis://localhost:6379/0"
+    cache_key_prefix: str = "cropmind:"
+    cache_memory_max_entries: int = 10000
+    enable_stage_summary_cache: bool = True
+    stage_summary_cache_ttl: int = 604800  # 7 days in seconds
+    stage_summary_cache_max_entries: int = 2048  # In-memory tier, per worker
+    enable_translation_memo: bool = True
+    translation_memo_max_entries: int = 10000  # In-memory LRU, per worker
+    translation_memo_ttl: int = 2592000  # 30 days in seconds
+    translation_memo_persist: bool = False  # Also store translations in the translation_memo table
+    identity_cache_ttl: int = 30  # Seconds a resolved user/farm snapshot is reused (per worker)
+    identity_cache_max_entries: int = 10000  # Snapshots kept per worker
+    enable_response_cache: bool = True  # Cache /lifecycle/status, /dashboard/weather and /user/profile responses
+    response_cache_ttl: int = 900  # Upper bound in seconds; mutations and the day changing invalidate sooner
+    response_cache_local_ttl: int = 5  # Upper bound with the memory backend (workers cannot see each other's invalidations)
+    response_cache_max_entries: int = 10000  # Responses kept per worker
+    
+    # ===== BACKGROUND JOBS =====
+    enable_job_scheduler: bool = False  # Run scheduled jobs inside the API process
+    daily_advice_run_hour_utc: int = 0  # Hour (UTC) the daily advice precomputation runs
+    daily_advice_temperature_band: int = 5  # Width in °C of temperature buckets used to group farms
+    daily_advice_concurrency: int = 4  # Parallel LLM groups during precomputation
+    enable_weather_warmer: bool = False  # Refresh farm weather cells ahead of expiry
+    weather_warm_interval: int = 300  # Seconds between warmer passes
+    weather_warm_ahead: int = 600  # Refresh cells expiring within this many seconds
+    weather_warm_concurrency: int = 4  # Cells refreshed in parallel per warmer pass
+    enable_alert_engine: bool = False  # Evaluate forecast alert rules for all farms periodically
+    alert_engine_interval: int = 3600  # Seconds between alert engine passes
+    alert_dedupe_hours: int = 24  # Skip an alert already raised for the farm within this window
+    alert_heat_threshold: float = 40.0  # °C max temperature in next 48h for heat alerts
+    alert_frost_threshold: float = 4.0  # °C min temperature in next 48h for frost alerts
+    alert_heavy_rain_mm: float = 20.0  # mm of rain in next 24h for heavy rain alerts
+    alert_flowering_heat_threshold: float = 35.0  # °C max temperature that stresses flowering crops
+    alert_harvest_rain_mm: float = 5.0  # mm of rain in next 48h that threatens harvest
+    enable_history_retention: bool = False  # Compact old advice_history rows daily
+    history_retention_run_hour_utc: int = 1  # Hour (UTC) the compaction runs
+    advice_history_retention_days: int = 30  # Raw rows older than this are rolled up and deleted
+    advice_history_compaction_batch: int = 5000  # Rows compacted per transaction
     
     # ===== LOGGING CONFIGURATION =====
     log_level: str = "INFO"
@@ -98,10 +182,18 @@ Explain WHY based on the situation.
 Output format:
 ACTION: [The Action]
 REASON: [Short explanation]
+"""
+    
+    localized_planner_instruction: str = """
+LANGUAGE:
+Write the action and reason in {language}. Keep the labels "ACTION:" and "REASON:" in English.
 """
     
     translation_prompt_template: str = "Translate the following agricultural advice to {language}. Keep the tone helpful and professional:\n\n{content}"
     
+    stage_summary_knowledge_template: str = "Farming practices for {crop} at {stage} stage."
+    stage_summary_query: str = "Provide one sentence of key advice for this stage."
+    
     # ===== FEATURE FLAGS =====
     enable_rag: bool = True
     enable_weather_api: bool = True
@@ -146,11 +238,23 @@ REASON: [Short explanation]
         if not self.groq_api_key:
             errors.append("GROQ_API_KEY is required but not configured")
         
-        if not self.pinecone_api_key:
-            errors.append("PINECONE_API_KEY is required but not configured")
+        if self.rag_backend.lower() not in ("local", "pinecone"):
+            errors.append("RAG_BACKEND must be 'local' or 'pinecone'")
+        
+        if self.rag_index_mode not in ("brute", "ivf"):
+            errors.append("RAG_INDEX_MODE must be 'brute' or 'ivf'")
+        
+        if self.enable_rag and self.rag_backend.lower() == "pinecone":
+            if not self.pinecone_api_key:
+                errors.append("PINECONE_API_KEY is required when RAG_BACKEND=pinecone")
+            if not self.pinecone_host:
+                errors.append("PINECONE_HOST is required when RAG_BACKEND=pinecone")
+        
+        if self.cache_backend.lower() not in ("memory", "redis", "fakeredis"):
+            errors.append("CACHE_BACKEND must be 'memory', 'redis' or 'fakeredis'")
         
-        if self.enable_rag and not self.pinecone_host:
-            errors.append("PINECONE_HOST is required when RAG is enabled")
+        if self.llm_advice_mode not in ("two_pass", "single_pass"):
+            errors.append("LLM_ADVICE_MODE must be 'two_pass' or 'single_pass'")
         
         if self.enable_weather_api and not self.weather_api_key:
             errors.append("WEATHER_API_KEY is required when real weather API is enabled (or set ENABLE_WEATHER_API=false to use mock data)")
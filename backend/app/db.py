@@ -1,4 +1,8 @@
-from sqlalchemy import create_engine
+from typing import AsyncIterator
+from sqlalchemy import Index, MetaData, create_engine, delete, func, inspect, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.config import get_settings
 
@@ -23,10 +27,131 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async drivers used by the API routers for each sync dialect
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite"
+}
+
+def to_async_url(url: str) -> str:
+    """
+    Swap the sync driver in a database URL for its async counterpart,
+    e.g. postgresql://... -> postgresql+asyncpg://...
+
+    Raises:
+        ValueError: If the dialect has no supported async driver
+    """
+    parsed = make_url(url)
+    if "+" in parsed.drivername and parsed.get_dialect().is_async:
+        return url
+    async_driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if async_driver is None:
+        raise ValueError(f"No async driver configured for database backend: {parsed.get_backend_name()}")
+    return parsed.set(drivername=async_driver).render_as_string(hide_password=False)
+
+ASYNC_DATABASE_URL = settings.async_database_url or to_async_url(DATABASE_URL)
+
+# Pool sizing applies to server databases; aiosqlite uses SQLAlchemy's default pool
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **({} if make_url(ASYNC_DATABASE_URL).get_backend_name() == "sqlite" else {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_pre_ping": True
+    })
+)
+
+# expire_on_commit=False keeps loaded attributes usable after commit without
+# an implicit (and, under asyncio, illegal) lazy refresh
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
 def get_db():
-    """Database session dependency for FastAPI endpoints"""
+    """Sync database session for jobs and scripts"""
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Async database session dependency for FastAPI endpoints"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def ensure_columns(metadata: MetaData) -> None:
+    """
+    Add nullable model columns missing from existing tables.
+    `create_all` never alters existing tables, so nullable columns added to a
+    model later are added here with ALTER TABLE (no-op when they exist).
+
+    Args:
+        metadata: Declarative metadata holding the models
+    """
+    inspector = inspect(engine)
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            with engine.begin() as connection:
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            print(f"✓ Added column {table.name}.{column.name}")
+
+def _delete_duplicates(index: Index) -> int:
+    """
+    Delete rows that would violate a unique index, keeping one per key.
+    The kept row is the first in the index's `info["keep_first"]` order
+    (SQL order-by terms), defaulting to the lowest primary key.
+
+    Args:
+        index: Unique index about to be created
+
+    Returns:
+        Number of rows deleted
+    """
+    table = index.table
+    primary_key = list(table.primary_key.columns)[0]
+    keep_first = [text(term) for term in index.info.get("keep_first", ())] or [primary_key]
+    ranked = select(
+        primary_key.label("row_id"),
+        func.row_number().over(partition_by=list(index.columns), order_by=keep_first).label("rank")
+    ).subquery()
+    with engine.begin() as connection:
+        result = connection.execute(delete(table).where(primary_key.in_(select(ranked.c.row_id).where(ranked.c.rank > 1))))
+    return result.rowcount
+
+def ensure_indexes(metadata: MetaData) -> None:
+    """
+    Create model indexes missing from existing tables.
+    `create_all` only creates indexes together with new tables, so indexes
+    added to a model later are created here (no-op when they exist).
+    Duplicate rows are removed before a unique index is built, since code
+    relying on the index (ON CONFLICT DO NOTHING) would silently stop
+    deduplicating without it. Failing to build a unique index stops startup;
+    other index failures are logged.
+
+    Args:
+        metadata: Declarative metadata holding the models
+
+    Raises:
+        RuntimeError: If a unique index cannot be created
+    """
+    inspector = inspect(engine)
+    for table in metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)} if inspector.has_table(table.name) else set()
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            try:
+                if index.unique:
+                    deleted = _delete_duplicates(index)
+                    if deleted:
+                        print(f"✓ Deleted {deleted} duplicate {table.name} rows before creating {index.name}")
+                index.create(bind=engine, checkfirst=True)
+            except SQLAlchemyError as e:
+                if index.unique:
+                    raise RuntimeError(f"Could not create unique index {index.name}: {e}") from e
+                print(f"✗ Could not create index {index.name}: {e}")
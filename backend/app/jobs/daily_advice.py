@@ -0,0 +1,144 @@
+"""
+Nightly precomputation of dashboard advice.
+
+Walks every farm profile, groups farms by (crop, current stage, weather bucket,
+language), asks the LLM once per group and stores the results in `daily_advice`.
+`/dashboard/summary` serves these rows and only generates live on a miss.
+
+Run manually with:
+    python -m app.jobs.daily_advice
+"""
+import asyncio
+import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy.exc import IntegrityError
+from app.config import get_settings
+from app.db import SessionLocal
+from app.models.database import User, FarmProfile, DailyAdvice
+from app.services.agents.farming_agents import FarmingAgents
+from app.services.agents.daily_advice import MOCK_BUCKET, daily_weather_bucket, bucket_weather_context
+from app.services.weather import get_weather_service
+
+settings = get_settings()
+
+GroupKey = Tuple[str, str, str, str]  # (crop_type, stage, weather_bucket, language)
+
+
+def _load_farms(advice_date: datetime.date) -> Tuple[List, Set[GroupKey]]:
+    """Farms to group and the groups already stored for the day (blocking)"""
+    with SessionLocal() as db:
+        farms = db.query(
+            FarmProfile.crop_type,
+            FarmProfile.sowing_date,
+            FarmProfile.latitude,
+            FarmProfile.longitude,
+            User.preferred_language
+        ).join(User, FarmProfile.user_id == User.id).all()
+
+        existing = {
+            (row.crop_type, row.stage, row.weather_bucket, row.language)
+            for row in db.query(
+                DailyAdvice.crop_type, DailyAdvice.stage, DailyAdvice.weather_bucket, DailyAdvice.language
+            ).filter(DailyAdvice.advice_date == advice_date).all()
+        }
+    return farms, existing
+
+
+def _store_rows(rows: List[DailyAdvice]) -> None:
+    """Insert generated rows, skipping groups another worker already stored (blocking)"""
+    with SessionLocal() as db:
+        db.add_all(rows)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another worker stored some of these groups; fall back to row-by-row inserts
+            db.rollback()
+            for row in rows:
+                db.add(row)
+                try:
+                    db.commit()
+                except IntegrityError:
+                    db.rollback()
+
+
+async def precompute_daily_advice(advice_date: Optional[datetime.date] = None) -> Dict[str, int]:
+    """
+    Generate and store advice for every farm group that has none for the day.
+
+    Args:
+        advice_date: Day to generate advice for (defaults to today)
+
+    Returns:
+        Counts of farms, groups and generated rows
+    """
+    advice_date = advice_date or datetime.date.today()
+    rag_service = None
+    if settings.enable_rag:
+        from app.services.rag import get_rag_service
+        rag_service = get_rag_service()
+
+    # Database work is blocking; keep it off the event loop when scheduled in-process
+    farms, existing = await asyncio.to_thread(_load_farms, advice_date)
+
+    groups = set()
+    buckets_by_location = {}
+    for farm in farms:
+        stage = FarmingAgents.get_crop_stage(farm.sowing_date, farm.crop_type, on_date=advice_date)
+        location = (farm.latitude, farm.longitude)
+        if location not in buckets_by_location:
+            # One bad location must not abort the run
+            try:
+                buckets_by_location[location] = await daily_weather_bucket(farm.latitude, farm.longitude, advice_date)
+            except Exception as e:
+                print(f"Daily advice weather bucket failed for {location}: {e}")
+                buckets_by_location[location] = MOCK_BUCKET
+        language = farm.preferred_language or settings.default_language
+        groups.add((farm.crop_type.lower(), stage, buckets_by_location[location], language))
+
+    pending = sorted(groups - existing)
+    limiter = asyncio.Semaphore(settings.daily_advice_concurrency)
+
+    async def generate(group: GroupKey) -> Optional[DailyAdvice]:
+        crop_type, stage, bucket, language = group
+        async with limiter:
+            try:
+                if rag_service:
+                    knowledge = await rag_service.get_relevant_advice(crop_type, stage)
+                else:
+                    knowledge = f"Standard agricultural practices for {crop_type} at {stage} stage."
+                advice = await FarmingAgents.plan_advice(stage, bucket_weather_context(bucket), knowledge, target_lang=language)
+            except Exception as e:
+                print(f"Daily advice generation failed for {group}: {e}")
+                return None
+        return DailyAdvice(
+            advice_date=advice_date,
+            crop_type=crop_type,
+            stage=stage,
+            weather_bucket=bucket,
+            language=language,
+            recommendation=advice
+        )
+
+    rows = [row for row in await asyncio.gather(*[generate(group) for group in pending]) if row is not None]
+
+    await asyncio.to_thread(_store_rows, rows)
+
+    return {"farms": len(farms), "groups": len(groups), "generated": len(rows)}
+
+
+async def _run_once() -> Dict[str, int]:
+    try:
+        return await precompute_daily_advice()
+    finally:
+        await get_weather_service().aclose()
+
+
+def main() -> None:
+    """CLI entry point"""
+    result = asyncio.run(_run_once())
+    print(f"✓ Daily advice precomputed: {result['generated']} new groups "
+          f"({result['groups']} groups across {result['farms']} farms)")
+
+
+if __name__ == "__main__":
+    main()
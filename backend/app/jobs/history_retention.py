@@ -0,0 +1,124 @@
+"""
+Advice history retention.
+
+`/dashboard/summary` records a row in `advice_history` on every view. Rows older
+than `advice_history_retention_days` are compacted into per-day, per-stage
+`advice_rollups` (count, first/last time, latest recommendation) and then
+deleted. Work is done in batches so each transaction stays small.
+
+Run manually with:
+    python -m app.jobs.history_retention
+"""
+import asyncio
+import datetime
+from typing import Dict, Optional, Tuple
+from app.config import get_settings
+from app.db import SessionLocal
+from app.models.database import AdviceHistory, AdviceRollup
+
+settings = get_settings()
+
+RollupKey = Tuple[int, datetime.date, Optional[str]]  # (farm_id, day, stage_at_time)
+
+
+def _compact_batch(cutoff: datetime.datetime, batch_size: int) -> int:
+    """
+    Roll up and delete one batch of rows older than cutoff.
+
+    Returns:
+        Number of raw rows compacted
+    """
+    with SessionLocal() as db:
+        rows = db.query(
+            AdviceHistory.id,
+            AdviceHistory.farm_id,
+            AdviceHistory.recommendation,
+            AdviceHistory.stage_at_time,
+            AdviceHistory.created_at
+        ).filter(
+            AdviceHistory.created_at < cutoff
+        ).order_by(AdviceHistory.id).limit(batch_size).all()
+        if not rows:
+            return 0
+
+        # Aggregate the batch in memory: rows are in id (≈ time) order
+        groups: Dict[RollupKey, dict] = {}
+        for row in rows:
+            key = (row.farm_id, row.created_at.date(), row.stage_at_time)
+            group = groups.setdefault(key, {"count": 0, "first_at": row.created_at, "last_at": row.created_at, "last": None})
+            group["count"] += 1
+            group["first_at"] = min(group["first_at"], row.created_at)
+            if row.created_at >= group["last_at"] or group["last"] is None:
+                group["last_at"] = row.created_at
+                group["last"] = row.recommendation
+
+        # Merge into rollups written by earlier batches or runs
+        existing = {
+            (rollup.farm_id, rollup.day, rollup.stage_at_time): rollup
+            for rollup in db.query(AdviceRollup).filter(
+                AdviceRollup.farm_id.in_({key[0] for key in groups}),
+                AdviceRollup.day.in_({key[1] for key in groups})
+            ).all()
+        }
+        for key, group in groups.items():
+            rollup = existing.get(key)
+            if rollup is None:
+                db.add(AdviceRollup(
+                    farm_id=key[0],
+                    day=key[1],
+                    stage_at_time=key[2],
+                    advice_count=group["count"],
+                    first_at=group["first_at"],
+                    last_at=group["last_at"],
+                    last_recommendation=group["last"]
+                ))
+                continue
+            rollup.advice_count += group["count"]
+            rollup.first_at = min(rollup.first_at, group["first_at"])
+            if group["last_at"] >= rollup.last_at:
+                rollup.last_at = group["last_at"]
+                rollup.last_recommendation = group["last"]
+
+        db.query(AdviceHistory).filter(
+            AdviceHistory.id.in_([row.id for row in rows])
+        ).delete(synchronize_session=False)
+        db.commit()
+        return len(rows)
+
+
+async def compact_advice_history(now: Optional[datetime.datetime] = None) -> Dict[str, int]:
+    """
+    Compact advice_history rows past the retention age into advice_rollups.
+
+    Args:
+        now: Reference time (defaults to the current UTC time)
+
+    Returns:
+        Counts of compacted rows and batches
+    """
+    now = now or datetime.datetime.utcnow()
+    cutoff = now - datetime.timedelta(days=settings.advice_history_retention_days)
+    batch_size = settings.advice_history_compaction_batch
+
+    compacted = 0
+    batches = 0
+    while True:
+        # Database work is blocking; keep it off the event loop when scheduled in-process
+        count = await asyncio.to_thread(_compact_batch, cutoff, batch_size)
+        compacted += count
+        if count:
+            batches += 1
+        if count < batch_size:
+            break
+
+    return {"compacted": compacted, "batches": batches}
+
+
+def main() -> None:
+    """CLI entry point"""
+    result = asyncio.run(compact_advice_history())
+    print(f"✓ Advice history compacted: {result['compacted']} rows in {result['batches']} batches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+RAG corpus ingestion.
+
+Embeds the knowledge corpus (built from the crop configuration and default
+task checklists, plus any `RAG_CORPUS_PATH` documents) and upserts it into
+the configured vector backend. Run it after changing the corpus when
+`RAG_BACKEND=pinecone`; the local backend builds its index in each worker.
+
+Run manually with:
+    python -m app.jobs.rag_ingest
+"""
+import asyncio
+import time
+from typing import Dict
+from app.services.rag import get_rag_service
+
+
+async def ingest_corpus() -> Dict[str, float]:
+    """
+    Embed and store the corpus in the configured backend.
+
+    Returns:
+        Document count and elapsed milliseconds
+    """
+    started = time.perf_counter()
+    documents = await get_rag_service().ingest()
+    return {"documents": documents, "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+def main() -> None:
+    """CLI entry point"""
+    result = asyncio.run(ingest_corpus())
+    print(f"✓ RAG corpus ingested: {result['documents']} documents in {result['elapsed_ms']}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Minimal in-process scheduler for CropMind AI background jobs.
+
+Used when ENABLE_JOB_SCHEDULER is set. With several API workers, prefer running
+the job CLIs from cron (or enable the scheduler on a single worker) so each job
+runs once per day.
+"""
+import asyncio
+import datetime
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+JobFunc = Callable[[], Awaitable[object]]
+
+
+class JobScheduler:
+    """
+    Runs registered coroutine jobs daily at a fixed UTC hour or at a fixed interval.
+    """
+
+    def __init__(self):
+        """Initialize an empty scheduler"""
+        self._jobs: List[Tuple[str, Callable[[], float], JobFunc]] = []
+        self._tasks: List[asyncio.Task] = []
+
+    def add_daily(self, name: str, hour_utc: int, func: JobFunc) -> None:
+        """
+        Register a job that runs once a day.
+
+        Args:
+            name: Job name for logging
+            hour_utc: Hour of day (UTC) to run at
+            func: Coroutine function to call
+        """
+        def seconds_until_next_run() -> float:
+            now = datetime.datetime.utcnow()
+            next_run = now.replace(hour=hour_utc, minute=0, second=0, microsecond=0)
+            if next_run <= now:
+                next_run += datetime.timedelta(days=1)
+            return (next_run - now).total_seconds()
+
+        self._jobs.append((name, seconds_until_next_run, func))
+
+    def add_interval(self, name: str, interval_seconds: float, func: JobFunc, run_immediately: bool = False) -> None:
+        """
+        Register a job that runs repeatedly with a fixed pause between runs.
+
+        Args:
+            name: Job name for logging
+            interval_seconds: Seconds to wait between runs
+            func: Coroutine function to call
+            run_immediately: Run once at startup instead of waiting a full interval
+        """
+        first_run = [run_immediately]
+
+        def delay() -> float:
+            if first_run[0]:
+                first_run[0] = False
+                return 0
+            return interval_seconds
+
+        self._jobs.append((name, delay, func))
+
+    async def _run_forever(self, name: str, delay: Callable[[], float], func: JobFunc) -> None:
+        while True:
+            await asyncio.sleep(delay())
+            try:
+                result = await func()
+                # Frequent housekeeping jobs return None and stay quiet
+                if result is not None:
+                    print(f"✓ Scheduled job '{name}' finished: {result}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"✗ Scheduled job '{name}' failed: {e}")
+
+    def start(self) -> None:
+        """Start one background task per registered job"""
+        for name, delay, func in self._jobs:
+            self._tasks.append(asyncio.create_task(self._run_forever(name, delay, func)))
+
+    async def stop(self) -> None:
+        """Cancel all running job tasks"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+
+# Singleton instance
+_scheduler: Optional[JobScheduler] = None
+
+
+def get_scheduler() -> JobScheduler:
+    """
+    Get singleton job scheduler instance.
+
+    Returns:
+        JobScheduler instance
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = JobScheduler()
+    return _scheduler
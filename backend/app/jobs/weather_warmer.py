@@ -0,0 +1,120 @@
+"""
+Background weather cache warmer.
+
+Reads the distinct weather grid cells covering all farm profiles and refreshes
+the current conditions and forecast series that are missing or about to
+expire, so `WeatherService.get_weather` (which needs both) almost always hits
+a warm cache.
+
+Refreshes run a few at a time and never wait for rate-limiter tokens: when
+only the reserve for live requests is left, the remaining cells are skipped
+until the next pass. With a shared cache backend, workers elect a leader
+through a lock key so the warmer runs once per deployment rather than once
+per worker; with the memory backend every worker warms its own cache.
+
+Run manually with:
+    python -m app.jobs.weather_warmer
+"""
+import asyncio
+import os
+import uuid
+from typing import Dict
+from app.config import get_settings
+from app.db import SessionLocal
+from app.models.database import FarmProfile
+from app.services.cache import get_shared_cache
+from app.services.weather import get_weather_service
+
+settings = get_settings()
+
+LEADER_KEY = "weather_warmer:leader"
+_worker_id = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+async def _is_leader() -> bool:
+    """
+    Take or renew the warmer lock in the shared cache.
+    The lock outlives two intervals, so another worker takes over only after
+    the leader stops renewing it.
+
+    Returns:
+        True if this worker should run the pass
+    """
+    shared = get_shared_cache()
+    if shared is None:
+        return True
+    ttl = 2 * settings.weather_warm_interval
+    holder = await shared.get(LEADER_KEY)
+    if holder is None:
+        return await shared.add(LEADER_KEY, _worker_id, ttl=ttl)
+    if holder != _worker_id:
+        return False
+    await shared.set(LEADER_KEY, _worker_id, ttl=ttl)
+    return True
+
+
+def _farm_coordinates() -> list:
+    """Distinct farm coordinates (sync; run in a thread)"""
+    with SessionLocal() as db:
+        return db.query(FarmProfile.latitude, FarmProfile.longitude).filter(
+            FarmProfile.latitude.isnot(None),
+            FarmProfile.longitude.isnot(None)
+        ).distinct().all()
+
+
+async def warm_weather_cache() -> Dict[str, int]:
+    """
+    Refresh farm weather cells and forecasts expiring within `weather_warm_ahead` seconds.
+
+    Returns:
+        Counts of cells seen and of refreshes done, skipped for quota and failed
+    """
+    weather_service = get_weather_service()
+    if not weather_service.uses_real_api or not await _is_leader():
+        return {"cells": 0, "refreshed": 0, "skipped": 0, "failed": 0}
+
+    coordinates = await asyncio.to_thread(_farm_coordinates)
+    cells = {weather_service.cell_key(lat, lon) for lat, lon in coordinates}
+    stale = [(weather_service.refresh_cell, key) for key in cells if weather_service.needs_refresh(key, settings.weather_warm_ahead)]
+    stale += [
+        (weather_service.refresh_forecast, key) for key in cells
+        if weather_service.needs_forecast_refresh(key, settings.weather_warm_ahead)
+    ]
+
+    semaphore = asyncio.Semaphore(settings.weather_warm_concurrency)
+
+    async def refresh(refresh_one, key) -> str:
+        async with semaphore:
+            try:
+                return "refreshed" if await refresh_one(key) else "skipped"
+            except Exception as e:
+                print(f"Weather warmer failed for {key}: {e}")
+                return "failed"
+
+    results = await asyncio.gather(*[refresh(refresh_one, key) for refresh_one, key in stale])
+    weather_service.purge_expired()
+
+    return {
+        "cells": len(cells),
+        "refreshed": results.count("refreshed"),
+        "skipped": results.count("skipped"),
+        "failed": results.count("failed")
+    }
+
+
+async def _run_once() -> Dict[str, int]:
+    try:
+        return await warm_weather_cache()
+    finally:
+        await get_weather_service().aclose()
+
+
+def main() -> None:
+    """CLI entry point"""
+    result = asyncio.run(_run_once())
+    print(f"✓ Weather cache warmed for {result['cells']} cells: {result['refreshed']} readings and forecasts refreshed "
+          f"({result['skipped']} skipped for quota, {result['failed']} failed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,34 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.db import engine, get_db
+from app.db import engine, async_engine, ensure_columns, ensure_indexes
 from app.api import onboarding, dashboard, chat, lifecycle, alerts, auth, user
 from app.db import engine
 from app.models import database
 from app.config import get_settings
+from app.services.agents.stage_summary_cache import get_stage_summary_cache
+from app.services.agents.translation_memo import get_translation_memo
+from app.services.agents.farming_agents import llm_single_flight
+from app.services.metrics import metrics
+from app.jobs.scheduler import get_scheduler
+from app.services.weather import get_weather_service
+from app.services.cache import get_cache_backend
+from app.services.identity import get_identity_resolver
+from app.services.write_behind import get_write_buffer
+from app.services.response_cache import get_response_cache
+from app.services.crop_config_loader import get_crop_loader
+from app.services.rag import get_rag_service
+from app.jobs.daily_advice import precompute_daily_advice
+from app.jobs.weather_warmer import warm_weather_cache
+from app.jobs.alert_engine import run_alert_engine
+from app.jobs.history_retention import compact_advice_history
 
 # Load configuration
 settings = get_settings()
 
 # Initialize database
 database.Base.metadata.create_all(bind=engine)
+ensure_columns(database.Base.metadata)
+ensure_indexes(database.Base.metadata)
 
 # Create FastAPI app with config from settings
 app = FastAPI(
@@ -31,6 +49,46 @@ async def startup_validation():
         print(f"  {e}")
         raise
 
+@app.on_event("startup")
+async def open_http_clients():
+    """Open pooled clients for upstream providers"""
+    await get_weather_service().startup()
+    get_write_buffer().start()
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    """Close pooled upstream clients on graceful shutdown"""
+    await get_weather_service().aclose()
+    await get_cache_backend().aclose()
+
+@app.on_event("shutdown")
+async def close_database():
+    """Flush buffered writes, then release pooled async database connections"""
+    await get_write_buffer().stop()
+    await async_engine.dispose()
+
+@app.on_event("startup")
+async def start_background_jobs():
+    """Start in-process background jobs that are enabled"""
+    scheduler = get_scheduler()
+    if settings.enable_job_scheduler:
+        scheduler.add_daily("daily_advice", settings.daily_advice_run_hour_utc, precompute_daily_advice)
+    if settings.enable_weather_warmer:
+        # Runs once right away, then every interval
+        scheduler.add_interval("weather_warmer", settings.weather_warm_interval, warm_weather_cache, run_immediately=True)
+    if settings.enable_alert_engine:
+        scheduler.add_interval("alert_engine", settings.alert_engine_interval, run_alert_engine)
+    if settings.enable_history_retention:
+        scheduler.add_daily("history_retention", settings.history_retention_run_hour_utc, compact_advice_history)
+    if settings.enable_crop_config_reload:
+        scheduler.add_interval("crop_config_reload", settings.crop_config_reload_interval, get_crop_loader(settings.crop_config_path).check_for_changes)
+    scheduler.start()
+
+@app.on_event("shutdown")
+async def stop_background_jobs():
+    """Cancel scheduled jobs on graceful shutdown"""
+    await get_scheduler().stop()
+
 # CORS Configuration from settings
 app.add_middleware(
     CORSMiddleware,
@@ -38,6 +96,7 @@ app.add_middleware(
     allow_credentials=settings.cors_allow_credentials,
     allow_methods=settings.cors_methods_list,
     allow_headers=settings.cors_headers_list,
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Include Routers
@@ -69,3 +128,21 @@ async def health_check():
         "weather_api_enabled": settings.enable_weather_api,
         "multilingual_enabled": settings.enable_multilingual
     }
+
+@app.get("/diagnostics")
+async def diagnostics():
+    """Cache and connection statistics for capacity planning"""
+    return {
+        "cache_backend": get_cache_backend().stats(),
+        "stage_summary_cache": get_stage_summary_cache().stats(),
+        "translation_memo": get_translation_memo().stats(),
+        "identity_cache": get_identity_resolver().stats(),
+        "write_behind": get_write_buffer().stats(),
+        "response_cache": get_response_cache().stats(),
+        "crop_config": get_crop_loader(settings.crop_config_path).stats(),
+        "rag": get_rag_service().stats(),
+        "llm_single_flight": llm_single_flight.stats(),
+        "weather_cache": get_weather_service().cache_stats(),
+        "weather_http_pool": get_weather_service().pool_stats(),
+        "metrics": metrics.snapshot()
+    }
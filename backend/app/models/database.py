@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Text, Float, Boolean
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Text, Float, Boolean, UniqueConstraint, Index
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import relationship
 import datetime
@@ -47,6 +47,10 @@ class FarmState(Base):
 
 class AdviceHistory(Base):
     __tablename__ = "advice_history"
+    __table_args__ = (
+        # Serves the newest-first "recent history" read per farm
+        Index("ix_advice_history_farm_created", "farm_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     farm_id = Column(Integer, ForeignKey("farm_profiles.id"))
@@ -57,18 +61,44 @@ class AdviceHistory(Base):
 
     farm_profile = relationship("FarmProfile", back_populates="advice_history")
 
+class AdviceRollup(Base):
+    __tablename__ = "advice_rollups"  # Per-day, per-stage summary of compacted advice_history rows
+    __table_args__ = (
+        UniqueConstraint("farm_id", "day", "stage_at_time", name="uq_advice_rollups_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    farm_id = Column(Integer, ForeignKey("farm_profiles.id"), nullable=False)
+    day = Column(Date, nullable=False)
+    stage_at_time = Column(String)
+    advice_count = Column(Integer, nullable=False, default=0)
+    first_at = Column(DateTime)
+    last_at = Column(DateTime)
+    last_recommendation = Column(Text)
+
 class Alert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (
+        # Serves per-farm keyset pagination ordered by (created_at, id)
+        Index("ix_alerts_farm_created", "farm_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     farm_id = Column(Integer, ForeignKey("farm_profiles.id"))
     type = Column(String) # Weather, Pest, Stage
     message = Column(Text, nullable=False)
     severity = Column(String) # Info, Warning, Critical
+    dedupe_key = Column(String, nullable=True) # Rule that raised the alert, e.g. "heat" (alert engine dedupe)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
 class FarmTask(Base):
     __tablename__ = "farm_tasks"
+    __table_args__ = (
+        # Lets concurrent default-task seeding skip rows that already exist.
+        # `keep_first` orders duplicates removed before the index is built (completed tasks win)
+        Index("uq_farm_tasks_stage_task", "farm_id", "stage_id", "task_name", unique=True,
+              info={"keep_first": ("is_completed DESC", "id")}),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     farm_id = Column(Integer, ForeignKey("farm_profiles.id"))
@@ -78,3 +108,47 @@ class FarmTask(Base):
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
     farm_profile = relationship("FarmProfile", back_populates="tasks")
+
+class StageSummary(Base):
+    __tablename__ = "stage_summaries"
+    __table_args__ = (
+        UniqueConstraint("crop_type", "stage_id", "language", "model", "prompt_hash", name="uq_stage_summaries_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    crop_type = Column(String, nullable=False)
+    stage_id = Column(String, nullable=False)
+    language = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    prompt_hash = Column(String(64), nullable=False) # Hash of prompt templates + crop config
+    summary = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+class TranslationMemo(Base):
+    __tablename__ = "translation_memo"
+    __table_args__ = (
+        UniqueConstraint("source_hash", "language", "model", "prompt_hash", name="uq_translation_memo_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    source_hash = Column(String(64), nullable=False) # SHA-256 of the source text
+    language = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    prompt_hash = Column(String(64), nullable=False) # Hash of the translation prompt template
+    translation = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+class DailyAdvice(Base):
+    __tablename__ = "daily_advice"
+    __table_args__ = (
+        UniqueConstraint("advice_date", "crop_type", "stage", "weather_bucket", "language", name="uq_daily_advice_group"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    advice_date = Column(Date, nullable=False)
+    crop_type = Column(String, nullable=False)
+    stage = Column(String, nullable=False) # Stage label, as shown on the dashboard
+    weather_bucket = Column(String, nullable=False) # e.g. "Rain|30-35" (forecast for the day)
+    language = Column(String, nullable=False)
+    recommendation = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
@@ -0,0 +1,137 @@
+"""
+Precomputed daily advice for CropMind AI.
+
+Farms sharing crop, stage, weather bucket and language get the same daily
+advice, so it is generated once per group by the nightly job
+(`app/jobs/daily_advice.py`) and served from the `daily_advice` table.
+
+The weather bucket must come out the same at midnight and at view time, so it
+is built from the day's forecast aggregates (rain expected, max-temperature
+band) rather than the current reading, and memoized per grid cell and day
+(in the shared cache backend too, when configured). Without a real weather
+API every farm falls into one bucket.
+"""
+import datetime
+import time
+from typing import Optional
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.models.database import DailyAdvice
+from app.services.cache import TTLCache, get_shared_cache
+from app.services.weather import ForecastSeries, get_weather_service
+
+settings = get_settings()
+
+DAY = 86400
+MOCK_BUCKET = "Unknown"  # Weather API disabled: readings are random, so they carry no signal
+
+# (grid cell, day) -> bucket; the first bucket computed for a day wins
+_day_buckets = TTLCache(maxsize=settings.weather_cache_max_entries, ttl=DAY)
+
+
+def forecast_bucket(forecast: ForecastSeries, day: datetime.date) -> str:
+    """
+    Coarse weather key for a day from a forecast series.
+
+    Args:
+        forecast: Forecast covering the day
+        day: Calendar day (local time)
+
+    Returns:
+        Bucket string such as "Rain|30-35" or "Dry|25-30"
+    """
+    start = datetime.datetime.combine(day, datetime.time.min).timestamp()
+    mask = (forecast.times >= start) & (forecast.times < start + DAY)
+    if not mask.any():
+        # Late in the day the series may no longer cover it; use the next 24 hours
+        now = time.time()
+        mask = (forecast.times >= now) & (forecast.times < now + DAY)
+    if not mask.any():
+        return MOCK_BUCKET
+
+    rain = bool(np.any((forecast.pop[mask] >= settings.weather_rain_probability_threshold) | (forecast.rain_mm[mask] > 0)))
+    band = settings.daily_advice_temperature_band
+    low = int(float(forecast.temperature[mask].max()) // band * band)
+    return f"{'Rain' if rain else 'Dry'}|{low}-{low + band}"
+
+
+async def daily_weather_bucket(latitude: Optional[float], longitude: Optional[float], day: Optional[datetime.date] = None) -> str:
+    """
+    Weather bucket for a farm location and day, shared by the nightly job and the dashboard.
+    Farms without coordinates and forecast errors get MOCK_BUCKET (not cached),
+    like `get_weather` falls back to mock data.
+
+    Args:
+        latitude: Farm latitude
+        longitude: Farm longitude
+        day: Calendar day (defaults to today)
+
+    Returns:
+        Bucket string
+    """
+    weather_service = get_weather_service()
+    if not weather_service.uses_real_api or latitude is None or longitude is None:
+        return MOCK_BUCKET
+
+    day = day or datetime.date.today()
+    cell = weather_service.cell_key(latitude, longitude)
+    bucket = _day_buckets.get((cell, day))
+    if bucket is not None:
+        return bucket
+
+    shared = get_shared_cache()
+    shared_key = f"weather_bucket:{day.isoformat()}:" + ":".join(str(part) for part in cell)
+    if shared is not None:
+        bucket = await shared.get(shared_key)
+    if bucket is None:
+        try:
+            forecast = await weather_service.get_forecast(latitude, longitude)
+        except Exception as e:
+            print(f"Weather forecast error: {e}. Using the default weather bucket.")
+            return MOCK_BUCKET
+        bucket = forecast_bucket(forecast, day)
+        if shared is not None:
+            await shared.set(shared_key, bucket, ttl=2 * DAY)
+    _day_buckets.set((cell, day), bucket)
+    return bucket
+
+
+def bucket_weather_context(bucket: str) -> str:
+    """Render a weather bucket as planner context, e.g. "Rain expected, max 30-35°C" """
+    if "|" not in bucket:
+        return "Normal"
+    rain, band = bucket.split("|", 1)
+    return f"{'Rain expected' if rain == 'Rain' else 'Dry'}, max {band}°C"
+
+
+async def get_precomputed_advice(
+    db: AsyncSession,
+    crop_type: str,
+    stage: str,
+    bucket: str,
+    language: str,
+    advice_date: Optional[datetime.date] = None
+) -> Optional[str]:
+    """
+    Look up today's precomputed advice for a farm group.
+
+    Args:
+        db: Database session
+        crop_type: Crop type
+        stage: Current stage label
+        bucket: Weather bucket from `daily_weather_bucket`
+        language: Farmer's preferred language
+        advice_date: Day to look up (defaults to today)
+
+    Returns:
+        Recommendation text or None on a miss
+    """
+    return await db.scalar(select(DailyAdvice.recommendation).where(
+        DailyAdvice.advice_date == (advice_date or datetime.date.today()),
+        DailyAdvice.crop_type == crop_type.lower(),
+        DailyAdvice.stage == stage,
+        DailyAdvice.weather_bucket == bucket,
+        DailyAdvice.language == language
+    ).limit(1))
@@ -1,16 +1,31 @@
 import os
-from groq import Groq
+import asyncio
+from typing import AsyncIterator
+from groq import AsyncGroq
 from datetime import date
 from app.config import get_settings
 from app.services.crop_config_loader import get_crop_loader
+from app.services.agents.translation_memo import get_translation_memo
+from app.services.cache import SingleFlight
 
 # Load configuration
 settings = get_settings()
-client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
+client = AsyncGroq(
+    api_key=os.environ.get("GROQ_API_KEY"),
+    timeout=settings.groq_timeout,
+    max_retries=settings.groq_max_retries
+)
+
+# Caps in-flight LLM calls per worker; excess callers wait without blocking the event loop
+_llm_semaphore = asyncio.Semaphore(settings.groq_max_concurrency)
+translation_memo = get_translation_memo()
+
+# Identical prompts issued concurrently (e.g. after a district-wide push) share one LLM call
+llm_single_flight = SingleFlight()
 
 class FarmingAgents:
     @staticmethod
-    def get_crop_stage(sowing_date: date, crop_type: str = "wheat"):
+    def get_crop_stage(sowing_date: date, crop_type: str = "wheat", on_date: date = None):
         """
         Get current crop stage based on sowing date and crop type.
         Uses external crop configuration for accurate stage detection.
@@ -18,11 +33,12 @@ class FarmingAgents:
         Args:
             sowing_date: Date when crop was sown
             crop_type: Type of crop (wheat, rice, cotton, sugarcane)
+            on_date: Day to evaluate the stage for (defaults to today)
         
         Returns:
             Current stage label
         """
-        days_passed = (date.today() - sowing_date).days
+        days_passed = ((on_date or date.today()) - sowing_date).days
         
         try:
             crop_loader = get_crop_loader(settings.crop_config_path)
@@ -36,7 +52,87 @@ class FarmingAgents:
             return "Harvest Preparation"
 
     @staticmethod
-    async def action_planner(stage: str, weather: str, knowledge_context: str, user_query: str = None):
+    async def _complete(prompt: str, temperature: float, max_tokens: int, top_p: float = None) -> str:
+        """
+        Run a single chat completion on the async Groq client.
+        Concurrent calls with the same (model, prompt, temperature, max_tokens,
+        top_p) are coalesced into one request, which waits on the global LLM
+        semaphore so at most `groq_max_concurrency` calls are in flight per worker.
+        
+        Args:
+            prompt: Fully rendered user prompt
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+            top_p: Optional nucleus sampling value
+        
+        Returns:
+            Completion text
+        """
+        params = {
+            "messages": [{"role": "user", "content": prompt}],
+            "model": settings.groq_model,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        if top_p is not None:
+            params["top_p"] = top_p
+        
+        async def call() -> str:
+            async with _llm_semaphore:
+                chat_completion = await client.chat.completions.create(**params)
+            return chat_completion.choices[0].message.content
+        
+        key = (settings.groq_model, prompt, temperature, max_tokens, top_p)
+        return await llm_single_flight.do(key, call)
+
+    @staticmethod
+    async def _stream(prompt: str, temperature: float, max_tokens: int, top_p: float = None) -> AsyncIterator[str]:
+        """
+        Stream a chat completion token by token.
+        Holds a slot of the global LLM semaphore for the whole stream.
+        
+        Args:
+            prompt: Fully rendered user prompt
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+            top_p: Optional nucleus sampling value
+        
+        Yields:
+            Completion text deltas as they arrive
+        """
+        params = {
+            "messages": [{"role": "user", "content": prompt}],
+            "model": settings.groq_model,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True
+        }
+        if top_p is not None:
+            params["top_p"] = top_p
+        
+        async with _llm_semaphore:
+            stream = await client.chat.completions.create(**params)
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+
+    @staticmethod
+    def _planner_prompt(stage: str, weather: str, knowledge_context: str, user_query: str = None, language: str = None) -> str:
+        """Render the Action Planner prompt, with the language instruction for non-English output"""
+        # Use prompt template from config
+        prompt = settings.action_planner_prompt_template.format(
+            stage=stage,
+            weather=weather,
+            knowledge=knowledge_context,
+            query=user_query if user_query else "General daily advice requested."
+        )
+        if language and FarmingAgents.needs_translation(language):
+            prompt += settings.localized_planner_instruction.format(language=language)
+        return prompt
+
+    @staticmethod
+    async def action_planner(stage: str, weather: str, knowledge_context: str, user_query: str = None, language: str = None):
         """
         Plan the most important action for the farmer today.
         Uses configurable prompt template and model settings.
@@ -46,26 +142,98 @@ class FarmingAgents:
             weather: Weather situation
             knowledge_context: Agricultural knowledge from RAG
             user_query: Optional farmer query
+            language: Optional output language; English when omitted
         
         Returns:
             Action plan with reasoning
         """
-        # Use prompt template from config
-        prompt = settings.action_planner_prompt_template.format(
-            stage=stage,
-            weather=weather,
-            knowledge=knowledge_context,
-            query=user_query if user_query else "General daily advice requested."
+        prompt = FarmingAgents._planner_prompt(stage, weather, knowledge_context, user_query, language)
+        return await FarmingAgents._complete(
+            prompt,
+            temperature=settings.groq_action_planner_temperature,
+            max_tokens=settings.groq_max_tokens,
+            top_p=settings.groq_top_p
         )
+
+    @staticmethod
+    def needs_translation(target_lang: str) -> bool:
+        """Whether advice for this language differs from the English output"""
+        return settings.enable_multilingual and bool(target_lang) and target_lang.lower() != "english"
+
+    @staticmethod
+    async def plan_advice(stage: str, weather: str, knowledge_context: str, user_query: str = None, target_lang: str = "English"):
+        """
+        Plan today's action in the farmer's language.
+        In `single_pass` mode the planner answers directly in the target language
+        (one LLM call); in `two_pass` mode, or if the localized answer does not
+        follow the ACTION/REASON format, the English plan is translated.
+        
+        Args:
+            stage: Current crop stage
+            weather: Weather situation
+            knowledge_context: Agricultural knowledge from RAG
+            user_query: Optional farmer query
+            target_lang: Farmer's preferred language
+        
+        Returns:
+            Action plan with reasoning in the target language
+        """
+        if settings.llm_advice_mode == "single_pass" and FarmingAgents.needs_translation(target_lang):
+            advice = await FarmingAgents.action_planner(stage, weather, knowledge_context, user_query, language=target_lang)
+            if "ACTION:" in advice:
+                return advice
+            print(f"Single-pass planner output for {target_lang} missing ACTION label. Falling back to translation.")
+        
+        raw_advice = await FarmingAgents.action_planner(stage, weather, knowledge_context, user_query)
+        return await FarmingAgents.translate_to_language(raw_advice, target_lang)
+
+    @staticmethod
+    async def stream_advice(stage: str, weather: str, knowledge_context: str, user_query: str = None, target_lang: str = "English") -> AsyncIterator[str]:
+        """
+        Streaming counterpart of `plan_advice`.
+        English and `single_pass` stream the planner directly; `two_pass` plans in
+        English first and streams the translation.
         
-        chat_completion = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model=settings.groq_model,
+        Args:
+            stage: Current crop stage
+            weather: Weather situation
+            knowledge_context: Agricultural knowledge from RAG
+            user_query: Optional farmer query
+            target_lang: Farmer's preferred language
+        
+        Yields:
+            Answer text deltas in the target language
+        """
+        if not FarmingAgents.needs_translation(target_lang) or settings.llm_advice_mode == "single_pass":
+            async for delta in FarmingAgents._stream(
+                FarmingAgents._planner_prompt(stage, weather, knowledge_context, user_query, target_lang),
+                temperature=settings.groq_action_planner_temperature,
+                max_tokens=settings.groq_max_tokens,
+                top_p=settings.groq_top_p
+            ):
+                yield delta
+            return
+        
+        raw_advice = await FarmingAgents._complete(
+            FarmingAgents._planner_prompt(stage, weather, knowledge_context, user_query),
             temperature=settings.groq_action_planner_temperature,
             max_tokens=settings.groq_max_tokens,
             top_p=settings.groq_top_p
         )
-        return chat_completion.choices[0].message.content
+        memoized = await translation_memo.get(raw_advice, target_lang)
+        if memoized is not None:
+            yield memoized
+            return
+        
+        parts = []
+        async for delta in FarmingAgents._stream(
+            settings.translation_prompt_template.format(language=target_lang, content=raw_advice),
+            temperature=settings.groq_translation_temperature,
+            max_tokens=settings.groq_max_tokens
+        ):
+            parts.append(delta)
+            yield delta
+        await translation_memo.put(raw_advice, target_lang, "".join(parts))
 
     @staticmethod
     async def translate_to_language(content: str, target_lang: str):
@@ -88,16 +256,21 @@ class FarmingAgents:
         if not settings.enable_multilingual:
             return content
         
+        # Repeated advice is translated once per language
+        memoized = await translation_memo.get(content, target_lang)
+        if memoized is not None:
+            return memoized
+        
         # Use translation prompt template from config
         prompt = settings.translation_prompt_template.format(
             language=target_lang,
             content=content
         )
         
-        chat_completion = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model=settings.groq_model,
+        translation = await FarmingAgents._complete(
+            prompt,
             temperature=settings.groq_translation_temperature,
             max_tokens=settings.groq_max_tokens
         )
-        return chat_completion.choices[0].message.content
+        await translation_memo.put(content, target_lang, translation)
+        return translation
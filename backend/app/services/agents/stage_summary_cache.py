@@ -0,0 +1,175 @@
+"""
+Shared cache for lifecycle stage summaries.
+
+Stage summaries only depend on crop, stage, language, model and the prompt
+configuration, so they are generated once and reused for every farmer.
+Entries live in an in-process TTL/LRU tier, the shared cache backend (when
+configured) and the `stage_summaries` table.
+"""
+import datetime
+import hashlib
+from typing import Dict, Iterable, Optional
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.models.database import StageSummary
+from app.services.cache import TTLCache, get_shared_cache
+from app.services.crop_config_loader import get_crop_loader
+
+
+class StageSummaryCache:
+    """
+    Tiered (memory, shared backend, database) cache keyed on
+    (crop, stage_id, language, groq_model, prompt_hash).
+    """
+
+    def __init__(self):
+        """Initialize cache tiers from configuration"""
+        self.settings = get_settings()
+        self.ttl = self.settings.stage_summary_cache_ttl
+        self._memory = TTLCache(
+            maxsize=self.settings.stage_summary_cache_max_entries,
+            ttl=self.ttl
+        )
+        self._shared = get_shared_cache()
+
+    def prompt_hash(self) -> str:
+        """
+        Hash of everything that shapes a stage summary besides the key columns.
+        Changes to the prompt settings or crop_config.yaml produce a new hash,
+        so older entries stop matching without an explicit flush.
+        """
+        crop_loader = get_crop_loader(self.settings.crop_config_path)
+        parts = [
+            self.settings.action_planner_prompt_template,
+            self.settings.translation_prompt_template,
+            self.settings.llm_advice_mode,
+            self.settings.localized_planner_instruction,
+            self.settings.stage_summary_knowledge_template,
+            self.settings.stage_summary_query,
+            str(self.settings.enable_multilingual),
+            crop_loader.fingerprint or ""
+        ]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _shared_key(key: tuple) -> str:
+        return "stage_summary:" + ":".join(key)
+
+    async def get_many(self, db: AsyncSession, crop_type: str, language: str, stage_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        Look up cached summaries for several stages of one crop.
+
+        Args:
+            db: Database session
+            crop_type: Crop type
+            language: Target language of the summaries
+            stage_ids: Stage ids to look up
+
+        Returns:
+            Mapping of stage_id to summary for every hit
+        """
+        if not self.settings.enable_stage_summary_cache:
+            return {}
+
+        crop_type = crop_type.lower()
+        prompt_hash = self.prompt_hash()
+        model = self.settings.groq_model
+
+        found = {}
+        missing = []
+        for stage_id in stage_ids:
+            key = (crop_type, stage_id, language, model, prompt_hash)
+            summary = self._memory.get(key)
+            if summary is None and self._shared is not None:
+                summary = await self._shared.get(self._shared_key(key))
+                if summary is not None:
+                    self._memory.set(key, summary)
+            if summary is None:
+                missing.append(stage_id)
+            else:
+                found[stage_id] = summary
+
+        if missing:
+            cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=self.ttl)
+            rows = (await db.execute(select(StageSummary.stage_id, StageSummary.summary).where(
+                StageSummary.crop_type == crop_type,
+                StageSummary.language == language,
+                StageSummary.model == model,
+                StageSummary.prompt_hash == prompt_hash,
+                StageSummary.stage_id.in_(missing),
+                StageSummary.created_at >= cutoff
+            ))).all()
+            for row in rows:
+                found[row.stage_id] = row.summary
+                self._memory.set((crop_type, row.stage_id, language, model, prompt_hash), row.summary)
+
+        return found
+
+    async def put_many(self, db: AsyncSession, crop_type: str, language: str, summaries: Dict[str, str]) -> None:
+        """
+        Store freshly generated summaries in both tiers.
+        Rows for the same key (or written under an older prompt hash) are replaced.
+
+        Args:
+            db: Database session
+            crop_type: Crop type
+            language: Target language of the summaries
+            summaries: Mapping of stage_id to summary
+        """
+        if not self.settings.enable_stage_summary_cache or not summaries:
+            return
+
+        crop_type = crop_type.lower()
+        prompt_hash = self.prompt_hash()
+        model = self.settings.groq_model
+
+        for stage_id, summary in summaries.items():
+            key = (crop_type, stage_id, language, model, prompt_hash)
+            self._memory.set(key, summary)
+            if self._shared is not None:
+                await self._shared.set(self._shared_key(key), summary, ttl=self.ttl)
+
+        try:
+            await db.execute(delete(StageSummary).where(
+                StageSummary.crop_type == crop_type,
+                StageSummary.language == language,
+                StageSummary.stage_id.in_(list(summaries.keys())),
+            ))
+            db.add_all([
+                StageSummary(
+                    crop_type=crop_type,
+                    stage_id=stage_id,
+                    language=language,
+                    model=model,
+                    prompt_hash=prompt_hash,
+                    summary=summary
+                )
+                for stage_id, summary in summaries.items()
+            ])
+            await db.commit()
+        except IntegrityError:
+            # Another worker stored the same keys concurrently; its rows are equivalent
+            await db.rollback()
+
+    def stats(self) -> Dict[str, int]:
+        """In-memory tier counters for diagnostics"""
+        return self._memory.stats()
+
+
+# Singleton instance
+_stage_summary_cache: Optional[StageSummaryCache] = None
+
+
+def get_stage_summary_cache() -> StageSummaryCache:
+    """
+    Get singleton stage summary cache instance.
+
+    Returns:
+        StageSummaryCache instance
+    """
+    global _stage_summary_cache
+    if _stage_summary_cache is None:
+        _stage_summary_cache = StageSummaryCache()
+    return _stage_summary_cache
@@ -0,0 +1,169 @@
+"""
+Content-addressed translation memo for CropMind AI.
+
+Translations are keyed by the SHA-256 of the source text, the target language,
+the model and the translation prompt template, so repeated advice is only sent
+to the LLM once per language. A bounded in-process LRU sits in front of the
+shared cache backend (when configured) and an optional durable `translation_memo` table.
+"""
+import hashlib
+from typing import Dict, Optional
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from app.config import get_settings
+from app.db import AsyncSessionLocal
+from app.models.database import TranslationMemo as TranslationMemoRow
+from app.services.cache import TTLCache, get_shared_cache
+
+
+class TranslationMemo:
+    """
+    Memoizes LLM translations in memory and, optionally, in the database.
+    """
+
+    def __init__(self):
+        """Initialize memo tiers from configuration"""
+        self.settings = get_settings()
+        self.enabled = self.settings.enable_translation_memo
+        self.persist = self.settings.translation_memo_persist
+        self._memory = TTLCache(
+            maxsize=self.settings.translation_memo_max_entries,
+            ttl=self.settings.translation_memo_ttl
+        )
+        self._shared = get_shared_cache()
+        self._prompt_hash = hashlib.sha256(
+            self.settings.translation_prompt_template.encode("utf-8")
+        ).hexdigest()
+        self.hits = 0
+        self.shared_hits = 0
+        self.durable_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def source_hash(content: str) -> str:
+        """SHA-256 of the source text"""
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def _key(self, source_hash: str, language: str) -> tuple:
+        return (source_hash, language.lower(), self.settings.groq_model, self._prompt_hash)
+
+    @staticmethod
+    def _shared_key(key: tuple) -> str:
+        return "translation:" + ":".join(key)
+
+    async def get(self, content: str, language: str) -> Optional[str]:
+        """
+        Look up a memoized translation.
+
+        Args:
+            content: Source text
+            language: Target language name
+
+        Returns:
+            Translated text or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        key = self._key(self.source_hash(content), language)
+        translation = self._memory.get(key)
+        if translation is not None:
+            self.hits += 1
+            return translation
+
+        if self._shared is not None:
+            translation = await self._shared.get(self._shared_key(key))
+            if translation is not None:
+                self._memory.set(key, translation)
+                self.shared_hits += 1
+                return translation
+
+        if self.persist:
+            translation = await self._load(key)
+            if translation is not None:
+                self._memory.set(key, translation)
+                if self._shared is not None:
+                    await self._shared.set(self._shared_key(key), translation, ttl=self.settings.translation_memo_ttl)
+                self.durable_hits += 1
+                return translation
+
+        self.misses += 1
+        return None
+
+    async def put(self, content: str, language: str, translation: str) -> None:
+        """
+        Memoize a translation.
+
+        Args:
+            content: Source text
+            language: Target language name
+            translation: Translated text
+        """
+        if not self.enabled:
+            return
+
+        key = self._key(self.source_hash(content), language)
+        self._memory.set(key, translation)
+        if self._shared is not None:
+            await self._shared.set(self._shared_key(key), translation, ttl=self.settings.translation_memo_ttl)
+        if self.persist:
+            await self._store(key, translation)
+
+    async def _load(self, key: tuple) -> Optional[str]:
+        """Read a translation from the durable table"""
+        source_hash, language, model, prompt_hash = key
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(select(TranslationMemoRow.translation).where(
+                TranslationMemoRow.source_hash == source_hash,
+                TranslationMemoRow.language == language,
+                TranslationMemoRow.model == model,
+                TranslationMemoRow.prompt_hash == prompt_hash
+            ).limit(1))
+
+    async def _store(self, key: tuple, translation: str) -> None:
+        """Write a translation to the durable table"""
+        source_hash, language, model, prompt_hash = key
+        async with AsyncSessionLocal() as db:
+            db.add(TranslationMemoRow(
+                source_hash=source_hash,
+                language=language,
+                model=model,
+                prompt_hash=prompt_hash,
+                translation=translation
+            ))
+            try:
+                await db.commit()
+            except IntegrityError:
+                # Same translation already stored by a concurrent request
+                await db.rollback()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for diagnostics"""
+        found = self.hits + self.shared_hits + self.durable_hits
+        lookups = found + self.misses
+        return {
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "durable_hits": self.durable_hits,
+            "misses": self.misses,
+            "hit_ratio": round(found / lookups, 3) if lookups else 0.0,
+            "size": len(self._memory),
+            "evictions": self._memory.evictions
+        }
+
+
+# Singleton instance
+_translation_memo: Optional[TranslationMemo] = None
+
+
+def get_translation_memo() -> TranslationMemo:
+    """
+    Get singleton translation memo instance.
+
+    Returns:
+        TranslationMemo instance
+    """
+    global _translation_memo
+    if _translation_memo is None:
+        _translation_memo = TranslationMemo()
+    return _translation_memo
@@ -0,0 +1,14 @@
+# Cache package
+from .ttl_cache import TTLCache
+from .single_flight import SingleFlight
+from .backends import CacheBackend, MemoryBackend, RedisBackend, get_cache_backend, get_shared_cache
+
+__all__ = [
+    "TTLCache",
+    "SingleFlight",
+    "CacheBackend",
+    "MemoryBackend",
+    "RedisBackend",
+    "get_cache_backend",
+    "get_shared_cache"
+]
@@ -0,0 +1,213 @@
+"""
+Pluggable cache backends for CropMind AI.
+
+`memory` keeps entries inside the worker process. `redis` talks to any
+Redis-protocol server so all uvicorn workers (and containers) share hits.
+`fakeredis` runs the Redis backend against an embedded fake server for
+local development and tests.
+
+Values must be JSON-serializable.
+"""
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+from app.config import get_settings
+from app.services.cache.ttl_cache import TTLCache
+
+
+class CacheBackend(ABC):
+    """
+    Async key/value cache with per-entry TTL.
+    Backend errors are logged and treated as misses so caching never fails a request.
+    """
+
+    #: True when entries are only visible to the current process
+    is_local: bool = False
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the value for key, or None on a miss"""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store value under key for ttl seconds"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove key if present"""
+
+    @abstractmethod
+    async def add(self, key: str, value: Any, ttl: float) -> bool:
+        """Store value under key only if the key is absent; returns whether it was stored"""
+
+    async def aclose(self) -> None:
+        """Release backend resources"""
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend diagnostics"""
+        return {"backend": type(self).__name__}
+
+
+class MemoryBackend(CacheBackend):
+    """In-process backend built on TTLCache"""
+
+    is_local = True
+
+    def __init__(self, maxsize: int, default_ttl: float):
+        """
+        Initialize the backend.
+
+        Args:
+            maxsize: Maximum number of entries
+            default_ttl: TTL used when a caller passes none
+        """
+        self._cache = TTLCache(maxsize=maxsize, ttl=default_ttl)
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+    async def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+    async def add(self, key: str, value: Any, ttl: float) -> bool:
+        if self._cache.get(key) is not None:
+            return False
+        self._cache.set(key, value, ttl=ttl)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._cache.stats()
+        stats["backend"] = "memory"
+        return stats
+
+
+class RedisBackend(CacheBackend):
+    """Redis-protocol backend shared by every worker pointing at the same server"""
+
+    def __init__(self, client, prefix: str):
+        """
+        Initialize the backend.
+
+        Args:
+            client: redis.asyncio-compatible client
+            prefix: Namespace prepended to every key
+        """
+        self._client = client
+        self._prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = await self._client.get(self._prefix + key)
+        except Exception as e:
+            self.errors += 1
+            print(f"Cache backend error on get: {e}")
+            return None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        try:
+            await self._client.set(self._prefix + key, json.dumps(value, ensure_ascii=False), px=max(1, int(ttl * 1000)))
+        except Exception as e:
+            self.errors += 1
+            print(f"Cache backend error on set: {e}")
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self._client.delete(self._prefix + key)
+        except Exception as e:
+            self.errors += 1
+            print(f"Cache backend error on delete: {e}")
+
+    async def add(self, key: str, value: Any, ttl: float) -> bool:
+        try:
+            stored = await self._client.set(self._prefix + key, json.dumps(value, ensure_ascii=False), px=max(1, int(ttl * 1000)), nx=True)
+        except Exception as e:
+            self.errors += 1
+            print(f"Cache backend error on add: {e}")
+            return False
+        return bool(stored)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors
+        }
+
+
+def create_cache_backend() -> CacheBackend:
+    """
+    Build the backend selected by `cache_backend` in settings.
+
+    Returns:
+        CacheBackend instance
+
+    Raises:
+        ValueError: If the backend name is unknown or its client library is missing
+    """
+    settings = get_settings()
+    name = settings.cache_backend.lower()
+
+    if name == "memory":
+        return MemoryBackend(maxsize=settings.cache_memory_max_entries, default_ttl=settings.weather_cache_ttl)
+
+    if name == "redis":
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError:
+            raise ValueError("CACHE_BACKEND=redis requires the 'redis' package")
+        client = redis_asyncio.from_url(settings.redis_url)
+        return RedisBackend(client, settings.cache_key_prefix)
+
+    if name == "fakeredis":
+        try:
+            from fakeredis import FakeAsyncRedis
+        except ImportError:
+            raise ValueError("CACHE_BACKEND=fakeredis requires the 'fakeredis' package (development only)")
+        return RedisBackend(FakeAsyncRedis(), settings.cache_key_prefix)
+
+    raise ValueError(f"Unsupported cache backend: {settings.cache_backend}")
+
+
+# Singleton instance
+_cache_backend: Optional[CacheBackend] = None
+
+
+def get_cache_backend() -> CacheBackend:
+    """
+    Get singleton cache backend instance.
+
+    Returns:
+        CacheBackend instance
+    """
+    global _cache_backend
+    if _cache_backend is None:
+        _cache_backend = create_cache_backend()
+    return _cache_backend
+
+
+def get_shared_cache() -> Optional[CacheBackend]:
+    """
+    Get the cache backend only if it is shared across processes.
+    Components that already keep an in-process tier use this as their second
+    tier and skip it when the backend is local (it would duplicate memory).
+
+    Returns:
+        Shared CacheBackend or None
+    """
+    backend = get_cache_backend()
+    return None if backend.is_local else backend
@@ -0,0 +1,59 @@
+"""
+Single-flight request coalescing for CropMind AI.
+Concurrent callers asking for the same key share one in-flight computation.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent async calls by key.
+    The first caller starts the work; callers arriving before it finishes await
+    the same task. Nothing is cached once the task completes.
+    """
+
+    def __init__(self):
+        """Initialize with no in-flight work"""
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run func once per key across concurrent callers.
+
+        Args:
+            key: Hashable identity of the work
+            func: Zero-argument coroutine function performing the work
+
+        Returns:
+            Result of the shared call (exceptions propagate to every caller)
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+        else:
+            self.followers += 1
+        # Shield so one cancelled caller does not cancel the work for the others
+        return await asyncio.shield(task)
+
+    def _release(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every caller went away
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Coalescing counters for diagnostics"""
+        total = self.leaders + self.followers
+        return {
+            "in_flight": len(self._inflight),
+            "executed": self.leaders,
+            "coalesced": self.followers,
+            "coalescing_ratio": round(self.followers / total, 3) if total else 0.0
+        }
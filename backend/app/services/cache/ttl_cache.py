@@ -0,0 +1,100 @@
+"""
+In-process TTL + LRU cache for CropMind AI.
+Bounded by entry count; entries expire after a fixed time-to-live.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Bounded mapping with per-entry expiry and least-recently-used eviction.
+    Safe to share between the event loop and worker threads.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the cache.
+        
+        Args:
+            maxsize: Maximum number of entries kept before LRU eviction
+            ttl: Default time-to-live in seconds
+            clock: Monotonic time source (overridable for testing)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value under key, evicting the least recently used entries if full"""
+        expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+    
+    def delete(self, key: Hashable) -> None:
+        """Remove key if present"""
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def expires_at(self, key: Hashable) -> Optional[float]:
+        """Expiry time (in clock units) of a live entry, or None if missing/expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= self._clock():
+                return None
+            return entry[0]
+    
+    def purge_expired(self) -> int:
+        """Drop every expired entry; returns the number removed"""
+        now = self._clock()
+        with self._lock:
+            expired = [key for key, (expires_at, _) in self._data.items() if expires_at <= now]
+            for key in expired:
+                del self._data[key]
+            self.evictions += len(expired)
+        return len(expired)
+    
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters for diagnostics"""
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
@@ -1,11 +1,148 @@
 """
 Crop Configuration Loader for CropMind AI.
 Loads crop-specific lifecycle configurations from YAML files.
+Each crop is compiled at load time into sorted stage boundary arrays and a
+dense day -> stage lookup table, so single and batch stage lookups are O(1).
+
+The validated, compiled configuration is written to a pickle snapshot next to
+the YAML (keyed by the YAML's SHA-256), so workers skip YAML parsing when the
+file has not changed. A changed file is re-validated, recompiled and swapped
+in as one immutable catalog; readers never see a half-loaded configuration.
 """
 import yaml
 import os
-from typing import Dict, List, Any, Optional
+import asyncio
+import datetime
+import hashlib
+import pickle
+import tempfile
+import threading
+import time
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 from functools import lru_cache
+import numpy as np
+from app.config import get_settings
+
+SNAPSHOT_FORMAT = 1  # Bump when CompiledCrop or CropCatalog change shape
+
+
+class CompiledCrop:
+    """
+    Precomputed stage index for one crop.
+    """
+
+    __slots__ = ("config", "stages", "ids", "labels", "starts", "ends", "total_days", "first_day", "day_table")
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Compile a crop configuration.
+
+        Args:
+            config: Crop entry from the YAML file (stages sorted by start_day)
+        """
+        self.config = config
+        self.stages: List[Dict[str, Any]] = config.get('stages', [])
+        self.ids = np.array([stage['id'] for stage in self.stages], dtype=object)
+        self.labels = np.array([stage['label'] for stage in self.stages], dtype=object)
+        self.starts = np.array([stage['start_day'] for stage in self.stages], dtype=np.int32)
+        self.ends = np.array([stage['end_day'] for stage in self.stages], dtype=np.int32)
+        self.total_days = config.get('total_days', 120)  # Default 120 if not specified
+
+        # day_table[day - first_day] is the stage index for that day (-1 in gaps)
+        self.first_day = int(self.starts.min()) if self.stages else 0
+        last_day = int(self.ends.max()) if self.stages else 0
+        self.day_table = np.full(max(last_day - self.first_day, 0), -1, dtype=np.int16)
+        for index, stage in enumerate(self.stages):
+            self.day_table[stage['start_day'] - self.first_day:stage['end_day'] - self.first_day] = index
+
+    def stage_indices(self, day_counts: np.ndarray) -> np.ndarray:
+        """
+        Stage index for each day count (-1 when no stage applies).
+        Days past the last stage map to the last stage.
+
+        Args:
+            day_counts: Integer array of days since sowing
+
+        Returns:
+            int16 array of stage indices
+        """
+        if not self.stages:
+            return np.full(np.shape(day_counts), -1, dtype=np.int16)
+        offsets = np.asarray(day_counts, dtype=np.int64) - self.first_day
+        inside = (offsets >= 0) & (offsets < len(self.day_table))
+        indices = np.where(inside, self.day_table[np.clip(offsets, 0, max(len(self.day_table) - 1, 0))], -1)
+        return np.where(offsets >= len(self.day_table), len(self.stages) - 1, indices).astype(np.int16)
+
+    def stage_index(self, day_count: int) -> int:
+        """Stage index for a single day count (-1 when no stage applies)"""
+        offset = day_count - self.first_day
+        if offset < 0 or not self.stages:
+            return -1
+        if offset >= len(self.day_table):
+            return len(self.stages) - 1
+        return int(self.day_table[offset])
+
+    def progress(self, day_counts: np.ndarray) -> np.ndarray:
+        """Lifecycle progress percentage (capped at 100) for each day count"""
+        return np.minimum(np.asarray(day_counts, dtype=np.float64) / self.total_days * 100, 100.0)
+
+
+def validate_config(config: Any) -> None:
+    """
+    Check a parsed crop configuration before it is compiled.
+    
+    Args:
+        config: Parsed YAML document
+    
+    Raises:
+        ValueError: If the configuration is malformed
+    """
+    if not isinstance(config, dict) or not isinstance(config.get('crops'), dict) or not config['crops']:
+        raise ValueError("Invalid crop configuration: 'crops' key not found")
+    
+    for crop_type, crop in config['crops'].items():
+        stages = crop.get('stages') if isinstance(crop, dict) else None
+        if not isinstance(stages, list) or not stages:
+            raise ValueError(f"Invalid crop configuration for '{crop_type}': no stages defined")
+        total_days = crop.get('total_days', 120)
+        if not isinstance(total_days, int) or total_days <= 0:
+            raise ValueError(f"Invalid crop configuration for '{crop_type}': total_days must be a positive integer")
+        
+        previous_end = None
+        for stage in stages:
+            missing = [key for key in ('id', 'label', 'start_day', 'end_day') if key not in stage]
+            if missing:
+                raise ValueError(f"Invalid crop configuration for '{crop_type}': stage missing {', '.join(missing)}")
+            if not isinstance(stage['start_day'], int) or not isinstance(stage['end_day'], int):
+                raise ValueError(f"Invalid crop configuration for '{crop_type}': stage '{stage['id']}' days must be integers")
+            if stage['start_day'] >= stage['end_day']:
+                raise ValueError(f"Invalid crop configuration for '{crop_type}': stage '{stage['id']}' ends before it starts")
+            if previous_end is not None and stage['start_day'] < previous_end:
+                raise ValueError(f"Invalid crop configuration for '{crop_type}': stage '{stage['id']}' overlaps the previous stage")
+            previous_end = stage['end_day']
+
+
+class CropCatalog:
+    """
+    Immutable, compiled view of one version of the crop configuration.
+    """
+    
+    __slots__ = ("config", "compiled", "fingerprint")
+    
+    def __init__(self, config: Dict[str, Any], fingerprint: str):
+        """
+        Compile every crop in a validated configuration.
+        
+        Args:
+            config: Parsed YAML document
+            fingerprint: SHA-256 of the YAML source
+        """
+        self.config = config
+        self.fingerprint = fingerprint
+        self.compiled: Dict[str, CompiledCrop] = {
+            crop_type.lower(): CompiledCrop(crop)
+            for crop_type, crop in config['crops'].items()
+        }
 
 
 class CropConfigLoader:
@@ -21,49 +158,183 @@ class CropConfigLoader:
         Args:
             config_path: Path to the crop configuration YAML file
         """
+        settings = get_settings()
         self.config_path = config_path
-        self._config = None
-        self._load_config()
+        self.snapshot_path = (
+            (settings.crop_config_snapshot_path or f"{config_path}.compiled.pkl")
+            if settings.enable_crop_config_snapshot else None
+        )
+        self._reload_lock = threading.Lock()
+        self.reloads = 0
+        self.reload_errors = 0
+        self.source = None  # "yaml" or "snapshot"
+        self.loaded_at = None
+        self._signature = self._file_signature()
+        self._catalog = self._load_catalog()
+    
+    @property
+    def fingerprint(self) -> str:
+        """SHA-256 of the YAML source, used to key derived caches"""
+        return self._catalog.fingerprint
     
-    def _load_config(self) -> None:
-        """Load the crop configuration from YAML file"""
+    def _file_signature(self) -> Tuple[int, int]:
+        """(mtime_ns, size) of the YAML file, used to detect edits cheaply"""
         if not os.path.exists(self.config_path):
             raise FileNotFoundError(
                 f"Crop configuration file not found: {self.config_path}"
             )
+        stat = os.stat(self.config_path)
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _load_catalog(self) -> CropCatalog:
+        """
+        Read, validate and compile the configuration, preferring a matching snapshot.
+        
+        Raises:
+            FileNotFoundError: If the YAML file does not exist
+            ValueError: If the YAML cannot be parsed or fails validation
+        """
+        with open(self.config_path, 'rb') as file:
+            raw = file.read()
+        fingerprint = hashlib.sha256(raw).hexdigest()
         
+        catalog = self._read_snapshot(fingerprint)
+        if catalog is not None:
+            self.source = "snapshot"
+        else:
+            try:
+                config = yaml.safe_load(raw.decode('utf-8'))
+            except yaml.YAMLError as e:
+                raise ValueError(f"Failed to parse crop configuration YAML: {e}")
+            validate_config(config)
+            catalog = CropCatalog(config, fingerprint)
+            self._write_snapshot(catalog)
+            self.source = "yaml"
+        
+        self.loaded_at = datetime.datetime.utcnow()
+        return catalog
+    
+    def _read_snapshot(self, fingerprint: str) -> Optional[CropCatalog]:
+        """Compiled catalog from the snapshot file if it was built from this YAML"""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return None
+        try:
+            # The snapshot is written only by this loader, next to the YAML it mirrors
+            with open(self.snapshot_path, 'rb') as file:
+                snapshot = pickle.load(file)
+            if snapshot.get('format') == SNAPSHOT_FORMAT and snapshot.get('fingerprint') == fingerprint:
+                return snapshot['catalog']
+        except Exception as e:
+            print(f"✗ Ignoring unreadable crop config snapshot: {e}")
+        return None
+    
+    def _write_snapshot(self, catalog: CropCatalog) -> None:
+        """Atomically replace the snapshot file (best effort)"""
+        if not self.snapshot_path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.snapshot_path))
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as file:
-                self._config = yaml.safe_load(file)
-        except yaml.YAMLError as e:
-            raise ValueError(f"Failed to parse crop configuration YAML: {e}")
+            with tempfile.NamedTemporaryFile('wb', dir=directory, delete=False, suffix='.tmp') as file:
+                pickle.dump(
+                    {'format': SNAPSHOT_FORMAT, 'fingerprint': catalog.fingerprint, 'catalog': catalog},
+                    file, protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(file.name, self.snapshot_path)
+        except OSError as e:
+            print(f"✗ Could not write crop config snapshot: {e}")
+    
+    def reload_if_changed(self) -> bool:
+        """
+        Reload the configuration if the YAML file changed since the last check.
+        An invalid file is reported and the current configuration is kept.
         
-        if not self._config or 'crops' not in self._config:
-            raise ValueError("Invalid crop configuration: 'crops' key not found")
+        Returns:
+            True if a new configuration was swapped in
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return False  # Another thread is already reloading
+        try:
+            try:
+                signature = self._file_signature()
+            except FileNotFoundError as e:
+                print(f"✗ Crop config reload skipped: {e}")
+                return False
+            if signature == self._signature:
+                return False
+            # Remember the signature even on failure so a bad file is reported once
+            self._signature = signature
+            
+            started = time.perf_counter()
+            try:
+                catalog = self._load_catalog()
+            except (OSError, ValueError) as e:
+                self.reload_errors += 1
+                print(f"✗ Crop config reload failed, keeping current configuration: {e}")
+                return False
+            if catalog.fingerprint == self._catalog.fingerprint:
+                return False
+            
+            # Single reference assignment: readers see either the old or the new catalog
+            self._catalog = catalog
+            self.reloads += 1
+            print(f"✓ Crop config reloaded from {self.source} in {(time.perf_counter() - started) * 1000:.1f}ms")
+            return True
+        finally:
+            self._reload_lock.release()
     
-    def get_crop_config(self, crop_type: str) -> Dict[str, Any]:
+    async def check_for_changes(self) -> None:
+        """Scheduler entry point: check for edits without blocking the event loop"""
+        await asyncio.to_thread(self.reload_if_changed)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Loaded configuration version and reload counters for diagnostics"""
+        return {
+            "fingerprint": self._catalog.fingerprint[:12],
+            "source": self.source,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors
+        }
+    
+    def get_compiled(self, crop_type: str) -> CompiledCrop:
         """
-        Get configuration for a specific crop type.
+        Get the compiled stage index for a crop type.
         
         Args:
-            crop_type: The crop type (e.g., 'wheat', 'rice', 'cotton', 'sugarcane')
+            crop_type: The crop type (any case)
         
         Returns:
-            Dictionary containing crop configuration with stages and total_days
+            CompiledCrop
         
         Raises:
             ValueError: If crop type is not found in configuration
         """
-        crop_type_lower = crop_type.lower()
-        
-        if crop_type_lower not in self._config['crops']:
-            available = ", ".join(self._config['crops'].keys())
+        catalog = self._catalog
+        compiled = catalog.compiled.get(crop_type)
+        if compiled is None:
+            compiled = catalog.compiled.get(crop_type.lower())
+        if compiled is None:
+            available = ", ".join(catalog.config['crops'].keys())
             raise ValueError(
                 f"Crop type '{crop_type}' not found in configuration. "
                 f"Available crops: {available}"
             )
+        return compiled
+    
+    def get_crop_config(self, crop_type: str) -> Dict[str, Any]:
+        """
+        Get configuration for a specific crop type.
+        
+        Args:
+            crop_type: The crop type (e.g., 'wheat', 'rice', 'cotton', 'sugarcane')
+        
+        Returns:
+            Dictionary containing crop configuration with stages and total_days
         
-        return self._config['crops'][crop_type_lower]
+        Raises:
+            ValueError: If crop type is not found in configuration
+        """
+        return self.get_compiled(crop_type).config
     
     def get_crop_stages(self, crop_type: str) -> List[Dict[str, Any]]:
         """
@@ -75,8 +346,7 @@ class CropConfigLoader:
         Returns:
             List of stage dictionaries
         """
-        config = self.get_crop_config(crop_type)
-        return config.get('stages', [])
+        return self.get_compiled(crop_type).stages
     
     def get_total_days(self, crop_type: str) -> int:
         """
@@ -88,8 +358,7 @@ class CropConfigLoader:
         Returns:
             Total number of days in the crop lifecycle
         """
-        config = self.get_crop_config(crop_type)
-        return config.get('total_days', 120)  # Default 120 if not specified
+        return self.get_compiled(crop_type).total_days
     
     def get_current_stage(self, crop_type: str, day_count: int) -> Optional[Dict[str, Any]]:
         """
@@ -102,17 +371,11 @@ class CropConfigLoader:
         Returns:
             Current stage dictionary or None
         """
-        stages = self.get_crop_stages(crop_type)
-        
-        for stage in stages:
-            if stage['start_day'] <= day_count < stage['end_day']:
-                return stage
-        
-        # If beyond all stages, return last stage
-        if stages and day_count >= stages[-1]['end_day']:
-            return stages[-1]
+        compiled = self.get_compiled(crop_type)
         
-        return None
+        # Days past all stages resolve to the last stage
+        index = compiled.stage_index(day_count)
+        return compiled.stages[index] if index >= 0 else None
     
     def get_stage_label(self, crop_type: str, day_count: int) -> str:
         """
@@ -142,6 +405,78 @@ class CropConfigLoader:
         total_days = self.get_total_days(crop_type)
         return min((day_count / total_days) * 100, 100.0)
     
+    def get_stage_statuses(self, crop_type: str, day_count: int) -> List[str]:
+        """
+        Status of every stage of a crop on a given day.
+        
+        Args:
+            crop_type: The crop type
+            day_count: Number of days since sowing
+        
+        Returns:
+            "completed", "current" or "upcoming" per stage, in stage order
+        """
+        compiled = self.get_compiled(crop_type)
+        return np.where(
+            day_count >= compiled.ends, "completed",
+            np.where(day_count >= compiled.starts, "current", "upcoming")
+        ).tolist()
+    
+    def batch_stages(self, crop_type: str, day_counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Stage ids and progress for many farms of one crop.
+        
+        Args:
+            crop_type: The crop type
+            day_counts: Integer array of days since sowing
+        
+        Returns:
+            (stage ids with "" where no stage applies, progress percentages)
+        """
+        return self._batch(self.get_compiled(crop_type), day_counts)
+    
+    @staticmethod
+    def _batch(compiled: CompiledCrop, day_counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Stage ids and progress for day counts of one compiled crop"""
+        indices = compiled.stage_indices(day_counts)
+        ids = np.where(indices >= 0, compiled.ids[np.maximum(indices, 0)] if len(compiled.ids) else "", "")
+        return ids.astype(object), compiled.progress(day_counts)
+    
+    def batch_stages_for(
+        self,
+        crop_types: Sequence[str],
+        sowing_dates: Sequence[datetime.date],
+        on_date: Optional[datetime.date] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Stage ids and progress for farms of mixed crops.
+        Unknown crops get an empty stage id and NaN progress.
+        
+        Args:
+            crop_types: Crop type per farm
+            sowing_dates: Sowing date per farm
+            on_date: Day to evaluate (defaults to today)
+        
+        Returns:
+            (stage ids, progress percentages, day counts)
+        """
+        on_date = on_date or datetime.date.today()
+        day_counts = (
+            np.datetime64(on_date, 'D') - np.asarray(sowing_dates, dtype='datetime64[D]')
+        ).astype(np.int64)
+        crops = np.array([crop_type.lower() for crop_type in crop_types], dtype=object)
+        
+        # One catalog for the whole batch, even if a reload lands midway
+        catalog = self._catalog
+        stage_ids = np.full(len(crops), "", dtype=object)
+        progress = np.full(len(crops), np.nan)
+        for crop_type in np.unique(crops):
+            if crop_type not in catalog.compiled:
+                continue
+            mask = crops == crop_type
+            stage_ids[mask], progress[mask] = self._batch(catalog.compiled[crop_type], day_counts[mask])
+        return stage_ids, progress, day_counts
+    
     def get_available_crops(self) -> List[str]:
         """
         Get list of all available crop types in the configuration.
@@ -149,13 +484,15 @@ class CropConfigLoader:
         Returns:
             List of crop type names
         """
-        return list(self._config['crops'].keys())
+        return list(self._catalog.config['crops'].keys())
 
 
 @lru_cache()
 def get_crop_loader(config_path: str = "app/config/crop_config.yaml") -> CropConfigLoader:
     """
     Get cached crop config loader instance.
+    Edits to the file are picked up by `reload_if_changed` (scheduled when
+    ENABLE_CROP_CONFIG_RELOAD is set), not by creating a new loader.
     
     Args:
         config_path: Path to crop configuration file
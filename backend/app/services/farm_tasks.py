@@ -0,0 +1,131 @@
+"""
+Default farm task checklist for CropMind AI.
+
+Each crop stage gets a default checklist the first time a farm needs it.
+All missing stages are seeded with one bulk `INSERT ... ON CONFLICT DO NOTHING
+RETURNING`, so concurrent first loads cannot duplicate tasks (the unique
+index on (farm_id, stage_id, task_name) decides the winner).
+"""
+from typing import Dict, Iterable, List
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.database import FarmTask
+
+DEFAULT_TASKS = {
+    "planning": ["Soil testing", "Seed selection", "Field preparation"],
+    "sowing": ["Seeds sown at optimal depth", "Initial irrigation", "Germination monitoring"],
+    "germination": ["Seedling emergence monitoring", "Moisture check", "Early pest inspection"],
+    "transplanting": ["Soil saturation", "Seedling selection", "Careful transplanting", "Initial post-transplant irrigation"],
+    "vegetative": ["First nitrogen application", "Weed control", "Second nitrogen application", "Pest monitoring"],
+    "growth": ["First nitrogen application", "Weed control", "Second nitrogen application", "Pest monitoring"],
+    "emergence": ["Stand count evaluation", "Moisture monitoring", "Early weed control"],
+    "tillering": ["Nitrogen top-dressing", "Irrigation management", "Weed monitoring"],
+    "stem_elongation": ["Water stress management", "Foliar nutrient spray", "Stem borer inspection"],
+    "flowering": ["Micronutrient spray", "Irrigation management", "Disease monitoring"],
+    "ripening": ["Wait for grain filling", "Late-stage moisture monitoring", "Bird protection"],
+    "boll_development": ["Pest control (Bollworms)", "Potash application", "Moisture management"],
+    "maturation": ["Sugar content check (Degrees Brix)", "Irrigation withdrawal", "Pre-harvest planning"],
+    "harvest": ["Harvest readiness check", "Equipment preparation", "Harvest and storage"]
+}
+
+# Dialect-specific inserts that support ON CONFLICT DO NOTHING
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert
+}
+
+# Columns the timeline needs for each task
+TASK_COLUMNS = (FarmTask.id, FarmTask.stage_id, FarmTask.task_name, FarmTask.is_completed)
+
+
+async def load_tasks(db: AsyncSession, farm_id: int, stage_ids: Iterable[str] = None) -> Dict[str, List]:
+    """
+    Load a farm's tasks grouped by stage id.
+
+    Args:
+        db: Database session
+        farm_id: Farm profile ID
+        stage_ids: Restrict to these stages (all stages when None)
+
+    Returns:
+        Dict of stage id -> task rows (id, stage_id, task_name, is_completed)
+    """
+    statement = select(*TASK_COLUMNS).where(FarmTask.farm_id == farm_id)
+    if stage_ids is not None:
+        statement = statement.where(FarmTask.stage_id.in_(list(stage_ids)))
+
+    tasks_by_stage: Dict[str, List] = {}
+    for task in (await db.execute(statement.order_by(FarmTask.id))).all():
+        tasks_by_stage.setdefault(task.stage_id, []).append(task)
+    return tasks_by_stage
+
+
+async def seed_default_tasks(db: AsyncSession, farm_id: int, stage_ids: Iterable[str]) -> Dict[str, List]:
+    """
+    Insert default tasks for the given stages in a single statement and commit.
+    Tasks that already exist are skipped.
+
+    Args:
+        db: Database session
+        farm_id: Farm profile ID
+        stage_ids: Stages to seed (stages without defaults are ignored)
+
+    Returns:
+        Dict of stage id -> newly inserted task rows
+    """
+    rows = [
+        {"farm_id": farm_id, "stage_id": stage_id, "task_name": task_name, "is_completed": False}
+        for stage_id in stage_ids
+        for task_name in DEFAULT_TASKS.get(stage_id, [])
+    ]
+    if not rows:
+        return {}
+
+    dialect_insert = _UPSERT_INSERTS.get(db.bind.dialect.name)
+    if dialect_insert is not None:
+        statement = dialect_insert(FarmTask).values(rows).on_conflict_do_nothing().returning(*TASK_COLUMNS)
+        inserted = (await db.execute(statement)).all()
+        await db.commit()
+    else:
+        # No ON CONFLICT support: a concurrent seed makes the whole batch fail instead
+        try:
+            inserted = (await db.execute(insert(FarmTask).returning(*TASK_COLUMNS), rows)).all()
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            inserted = []
+
+    seeded: Dict[str, List] = {}
+    for task in sorted(inserted, key=lambda t: t.id):
+        seeded.setdefault(task.stage_id, []).append(task)
+    return seeded
+
+
+async def ensure_default_tasks(db: AsyncSession, farm_id: int, stage_ids: List[str]) -> Dict[str, List]:
+    """
+    Load a farm's tasks, seeding defaults for stages that have none yet.
+    Once every stage is seeded this is a single read.
+
+    Args:
+        db: Database session
+        farm_id: Farm profile ID
+        stage_ids: Stages of the farm's crop
+
+    Returns:
+        Dict of stage id -> task rows
+    """
+    tasks_by_stage = await load_tasks(db, farm_id)
+    missing = [stage_id for stage_id in stage_ids if stage_id not in tasks_by_stage and stage_id in DEFAULT_TASKS]
+    if not missing:
+        return tasks_by_stage
+
+    seeded = await seed_default_tasks(db, farm_id, missing)
+    tasks_by_stage.update(seeded)
+
+    # Another request seeded some of these stages first; read what it inserted
+    raced = [stage_id for stage_id in missing if len(seeded.get(stage_id, [])) < len(DEFAULT_TASKS[stage_id])]
+    if raced:
+        tasks_by_stage.update(await load_tasks(db, farm_id, raced))
+    return tasks_by_stage
@@ -0,0 +1,136 @@
+"""
+Request identity resolution for CropMind AI.
+
+Endpoints identify the farmer by email. The resolver loads the user, their
+farm profile and farm state in one joined query and returns an immutable
+snapshot. Snapshots are kept in a short-lived per-process TTL/LRU cache, so
+most requests skip the lookup entirely. Mutating endpoints call `invalidate`
+and the TTL bounds staleness across workers.
+"""
+import datetime
+from typing import Any, Dict, NamedTuple, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.models.database import User, FarmProfile, FarmState
+from app.services.cache import TTLCache
+
+
+class FarmSnapshot(NamedTuple):
+    """Read-only copy of a farm profile (field names match FarmProfile)"""
+    id: int
+    crop_type: str
+    sowing_date: datetime.date
+    state: str
+    district: str
+    village: str
+    latitude: Optional[float]
+    longitude: Optional[float]
+    state_id: Optional[int]  # FarmState row id, if one exists
+
+
+class Identity(NamedTuple):
+    """Read-only copy of a user and their farm (field names match User)"""
+    id: int
+    email: str
+    name: Optional[str]
+    preferred_language: Optional[str]
+    farm_profile: Optional[FarmSnapshot]
+
+
+class IdentityResolver:
+    """
+    Resolves emails to Identity snapshots behind a TTL/LRU cache.
+    """
+
+    def __init__(self):
+        """Initialize the cache from configuration"""
+        self.settings = get_settings()
+        self._cache = TTLCache(
+            maxsize=self.settings.identity_cache_max_entries,
+            ttl=self.settings.identity_cache_ttl
+        )
+
+    async def resolve(self, db: AsyncSession, email: str, fresh: bool = False) -> Optional[Identity]:
+        """
+        Look up a user with their farm profile and farm state.
+
+        Args:
+            db: Database session
+            email: User email
+            fresh: Skip the cached snapshot and read the database (for endpoints
+                that write based on profile values); the result is cached again
+
+        Returns:
+            Identity snapshot or None if the user does not exist
+        """
+        identity = None if fresh else self._cache.get(email)
+        if identity is not None:
+            return identity
+
+        row = (await db.execute(
+            select(
+                User.id, User.email, User.name, User.preferred_language,
+                FarmProfile.id.label("farm_id"), FarmProfile.crop_type, FarmProfile.sowing_date,
+                FarmProfile.state, FarmProfile.district, FarmProfile.village,
+                FarmProfile.latitude, FarmProfile.longitude,
+                FarmState.id.label("state_id")
+            )
+            .outerjoin(FarmProfile, FarmProfile.user_id == User.id)
+            .outerjoin(FarmState, FarmState.farm_id == FarmProfile.id)
+            .where(User.email == email)
+            .order_by(FarmProfile.id, FarmState.id)
+            .limit(1)
+        )).first()
+
+        # Unknown users are not cached so a login or onboarding is visible immediately
+        if row is None:
+            return None
+
+        farm = None
+        if row.farm_id is not None:
+            farm = FarmSnapshot(
+                id=row.farm_id,
+                crop_type=row.crop_type,
+                sowing_date=row.sowing_date,
+                state=row.state,
+                district=row.district,
+                village=row.village,
+                latitude=row.latitude,
+                longitude=row.longitude,
+                state_id=row.state_id
+            )
+        identity = Identity(
+            id=row.id,
+            email=row.email,
+            name=row.name,
+            preferred_language=row.preferred_language,
+            farm_profile=farm
+        )
+        self._cache.set(email, identity)
+        return identity
+
+    def invalidate(self, email: str) -> None:
+        """Drop the cached snapshot after the user or their farm changes"""
+        self._cache.delete(email)
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters for diagnostics"""
+        return self._cache.stats()
+
+
+# Singleton instance
+_identity_resolver: Optional[IdentityResolver] = None
+
+
+def get_identity_resolver() -> IdentityResolver:
+    """
+    Get singleton identity resolver instance.
+
+    Returns:
+        IdentityResolver instance
+    """
+    global _identity_resolver
+    if _identity_resolver is None:
+        _identity_resolver = IdentityResolver()
+    return _identity_resolver
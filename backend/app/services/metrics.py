@@ -0,0 +1,58 @@
+"""
+Lightweight in-process metrics for CropMind AI.
+Keeps counters and recent latency samples per worker for the /diagnostics endpoint.
+"""
+import threading
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict
+
+
+class Metrics:
+    """
+    Named counters plus bounded latency windows with percentile summaries.
+    """
+
+    def __init__(self, window: int = 1000):
+        """
+        Initialize the registry.
+
+        Args:
+            window: Number of most recent samples kept per timing
+        """
+        self.window = window
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._timings: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        """Increment a counter"""
+        with self._lock:
+            self._counters[name] += amount
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record a latency sample in seconds"""
+        with self._lock:
+            samples = self._timings.get(name)
+            if samples is None:
+                samples = self._timings[name] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters and p50/p95/max summaries of recent timings (milliseconds)"""
+        with self._lock:
+            timings = {}
+            for name, samples in self._timings.items():
+                ordered = sorted(samples)
+                if not ordered:
+                    continue
+                timings[name] = {
+                    "count": len(ordered),
+                    "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+                    "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+                    "max_ms": round(ordered[-1] * 1000, 1)
+                }
+            return {"counters": dict(self._counters), "timings": timings}
+
+
+# Process-wide registry
+metrics = Metrics()
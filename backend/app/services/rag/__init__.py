@@ -0,0 +1,17 @@
+# RAG package
+from .rag_service import RAGService, get_rag_service
+from .backends import Match, VectorBackend, LocalVectorBackend, PineconeBackend
+from .embeddings import Embedder, HashingEmbedder
+from .vector_index import VectorIndex
+
+__all__ = [
+    "RAGService",
+    "get_rag_service",
+    "Match",
+    "VectorBackend",
+    "LocalVectorBackend",
+    "PineconeBackend",
+    "Embedder",
+    "HashingEmbedder",
+    "VectorIndex"
+]
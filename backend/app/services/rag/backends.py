@@ -0,0 +1,199 @@
+"""
+Vector store backends for RAG retrieval.
+
+`local` keeps the corpus in an in-process NumPy index (see vector_index.py);
+each worker builds it from the corpus on first use, so it works offline.
+`pinecone` queries a Pinecone index that was filled by
+`python -m app.jobs.rag_ingest`. Both apply the crop/stage filter before
+scoring and return at most `top_k` matches.
+"""
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+import numpy as np
+from app.config import get_settings
+from app.services.rag.corpus import Document
+from app.services.rag.vector_index import ANY, VectorIndex
+
+
+class Match(NamedTuple):
+    """A retrieved passage"""
+    id: str
+    score: float
+    text: str
+    crop: str
+    stage: str
+
+
+class VectorBackend(ABC):
+    """
+    Stores document vectors and answers filtered top-k similarity queries.
+    """
+
+    #: True when every worker holds its own copy of the corpus
+    is_local: bool = False
+
+    @abstractmethod
+    async def ingest(self, documents: Sequence[Document], vectors: np.ndarray) -> None:
+        """Store documents and their vectors (replacing any with the same id)"""
+
+    @abstractmethod
+    async def query(self, vector: np.ndarray, top_k: int, crop: Optional[str] = None, stage: Optional[str] = None) -> List[Match]:
+        """Most similar documents for crop and stage (None means any), best first"""
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend diagnostics"""
+        return {"backend": type(self).__name__}
+
+
+class LocalVectorBackend(VectorBackend):
+    """In-process NumPy index"""
+
+    is_local = True
+
+    def __init__(self, mode: str, nlist: int, nprobe: int):
+        """
+        Initialize an empty backend.
+
+        Args:
+            mode: Index mode ("brute" or "ivf")
+            nlist: IVF clusters
+            nprobe: IVF clusters scanned per query
+        """
+        self.mode = mode
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self._index = VectorIndex(mode, nlist, nprobe)
+        self._documents: List[Document] = []
+
+    async def ingest(self, documents: Sequence[Document], vectors: np.ndarray) -> None:
+        # Rebuilt from the full corpus off to the side, then swapped in with its documents
+        documents = list(documents)
+        index = VectorIndex(self.mode, self.nlist, self.nprobe)
+        await asyncio.to_thread(index.build, vectors, [doc.crop for doc in documents], [doc.stage for doc in documents])
+        self._index, self._documents = index, documents
+
+    async def query(self, vector: np.ndarray, top_k: int, crop: Optional[str] = None, stage: Optional[str] = None) -> List[Match]:
+        index, documents = self._index, self._documents
+        return [
+            Match(documents[row].id, score, documents[row].text, documents[row].crop, documents[row].stage)
+            for row, score in index.search(vector, top_k, crop, stage)
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "local", "mode": self.mode, **self._index.stats()}
+
+
+class PineconeBackend(VectorBackend):
+    """Pinecone index, connected on first use"""
+
+    UPSERT_BATCH = 100
+
+    def __init__(self, api_key: str, index_name: str, host: Optional[str], dimension: int):
+        """
+        Initialize the backend.
+
+        Args:
+            api_key: Pinecone API key
+            index_name: Index name
+            host: Index host URL
+            dimension: Index vector size
+        """
+        self.api_key = api_key
+        self.index_name = index_name
+        self.host = host
+        self.dimension = dimension
+        self._index = None
+
+    def _get_index(self):
+        if self._index is None:
+            try:
+                from pinecone import Pinecone
+            except ImportError:
+                raise ValueError("RAG_BACKEND=pinecone requires the 'pinecone-client' package")
+            self._index = Pinecone(api_key=self.api_key).Index(name=self.index_name, host=self.host)
+        return self._index
+
+    def _check_dimension(self, vectors: np.ndarray) -> None:
+        if vectors.shape[-1] != self.dimension:
+            raise ValueError(
+                f"Embedding size {vectors.shape[-1]} does not match PINECONE_DIMENSION={self.dimension}"
+            )
+
+    @staticmethod
+    def _filter(crop: Optional[str], stage: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Pinecone metadata filter matching the value or ANY"""
+        conditions = {
+            field: {"$in": [value, ANY]}
+            for field, value in (("crop", crop), ("stage", stage)) if value is not None
+        }
+        return conditions or None
+
+    async def ingest(self, documents: Sequence[Document], vectors: np.ndarray) -> None:
+        self._check_dimension(vectors)
+        index = self._get_index()
+        records = [
+            {
+                "id": doc.id,
+                "values": vector.tolist(),
+                "metadata": {"text": doc.text, "crop": doc.crop, "stage": doc.stage}
+            }
+            for doc, vector in zip(documents, vectors)
+        ]
+        for start in range(0, len(records), self.UPSERT_BATCH):
+            await asyncio.to_thread(index.upsert, vectors=records[start:start + self.UPSERT_BATCH])
+
+    async def query(self, vector: np.ndarray, top_k: int, crop: Optional[str] = None, stage: Optional[str] = None) -> List[Match]:
+        self._check_dimension(vector)
+        # pinecone-client is synchronous; keep the call off the event loop
+        result = await asyncio.to_thread(
+            self._get_index().query,
+            vector=vector.tolist(),
+            top_k=top_k,
+            include_metadata=True,
+            filter=self._filter(crop, stage)
+        )
+        return [
+            Match(
+                match.id,
+                float(match.score),
+                (match.metadata or {}).get("text", ""),
+                (match.metadata or {}).get("crop", ANY),
+                (match.metadata or {}).get("stage", ANY)
+            )
+            for match in result.matches
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "pinecone", "index": self.index_name, "connected": self._index is not None}
+
+
+def create_vector_backend() -> VectorBackend:
+    """
+    Build the backend selected by `rag_backend` in settings.
+
+    Returns:
+        VectorBackend instance
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    settings = get_settings()
+    name = settings.rag_backend.lower()
+
+    if name == "local":
+        return LocalVectorBackend(
+            mode=settings.rag_index_mode,
+            nlist=settings.rag_ivf_lists,
+            nprobe=settings.rag_ivf_probes
+        )
+
+    if name == "pinecone":
+        return PineconeBackend(
+            api_key=settings.pinecone_api_key,
+            index_name=settings.pinecone_index,
+            host=settings.pinecone_host,
+            dimension=settings.pinecone_dimension
+        )
+
+    raise ValueError(f"Unsupported RAG backend: {settings.rag_backend}")
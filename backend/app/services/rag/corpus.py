@@ -0,0 +1,106 @@
+"""
+Knowledge corpus for RAG retrieval.
+
+The built-in corpus is derived from the crop configuration (crop and stage
+descriptions, stage windows) and the default stage task checklists. Extra
+documents can be supplied as JSON Lines via `RAG_CORPUS_PATH`, one object per
+line: {"id": ..., "text": ..., "crop": ..., "stage": ...}. A missing crop or
+stage means the document applies to all crops or stages.
+"""
+import json
+import os
+from typing import List, NamedTuple, Optional
+from app.services.crop_config_loader import CropConfigLoader
+from app.services.farm_tasks import DEFAULT_TASKS
+from app.services.rag.vector_index import ANY
+
+
+class Document(NamedTuple):
+    """A retrievable passage and its metadata"""
+    id: str
+    text: str
+    crop: str  # Lower-case crop type or ANY
+    stage: str  # Stage id or ANY
+
+
+def builtin_documents(crop_loader: CropConfigLoader) -> List[Document]:
+    """
+    Passages generated from the crop configuration and default tasks.
+
+    Args:
+        crop_loader: Loaded crop configuration
+
+    Returns:
+        List of documents
+    """
+    documents = []
+    for crop_type in crop_loader.get_available_crops():
+        crop = crop_type.lower()
+        config = crop_loader.get_crop_config(crop)
+        name = crop.capitalize()
+        labels = ", ".join(stage["label"] for stage in config["stages"])
+        documents.append(Document(
+            id=f"{crop}:overview",
+            text=f"{name}: {config.get('description', '')}. The crop cycle lasts about {crop_loader.get_total_days(crop)} days "
+                 f"after sowing and moves through these stages: {labels}.",
+            crop=crop,
+            stage=ANY
+        ))
+        for stage in config["stages"]:
+            text = (
+                f"{name} {stage['label']} stage (day {stage['start_day']} to day {stage['end_day']} after sowing): "
+                f"{stage.get('description', '')}."
+            )
+            tasks = DEFAULT_TASKS.get(stage["id"])
+            if tasks:
+                text += f" Recommended {stage['label'].lower()} tasks for {crop}: {', '.join(tasks)}."
+            documents.append(Document(id=f"{crop}:{stage['id']}", text=text, crop=crop, stage=stage["id"]))
+    return documents
+
+
+def load_corpus_file(path: str) -> List[Document]:
+    """
+    Read extra documents from a JSON Lines file.
+
+    Args:
+        path: File path
+
+    Returns:
+        List of documents
+
+    Raises:
+        ValueError: If a line is not a valid document
+    """
+    documents = []
+    with open(path, encoding="utf-8") as file:
+        for number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                documents.append(Document(
+                    id=str(record.get("id") or f"{os.path.basename(path)}:{number}"),
+                    text=record["text"],
+                    crop=(record.get("crop") or ANY).lower(),
+                    stage=record.get("stage") or ANY
+                ))
+            except (json.JSONDecodeError, KeyError, AttributeError) as e:
+                raise ValueError(f"Invalid RAG corpus line {number} in {path}: {e}")
+    return documents
+
+
+def build_corpus(crop_loader: CropConfigLoader, corpus_path: Optional[str] = None) -> List[Document]:
+    """
+    Built-in documents plus any from the corpus file.
+
+    Args:
+        crop_loader: Loaded crop configuration
+        corpus_path: Optional JSON Lines file
+
+    Returns:
+        List of documents
+    """
+    documents = builtin_documents(crop_loader)
+    if corpus_path:
+        documents.extend(load_corpus_file(corpus_path))
+    return documents
@@ -0,0 +1,133 @@
+"""
+Text embedders for RAG retrieval.
+
+`hashing` is a dependency-free, CPU-only embedder: word unigrams, word bigrams
+and character trigrams are hashed (with a sign bit) into a fixed number of
+dimensions and L2-normalized. It needs no model download and gives the same
+vectors in every process. Any other `RAG_EMBEDDING_MODEL` value is loaded
+with sentence-transformers on CPU (optional dependency).
+"""
+import hashlib
+import re
+from abc import ABC, abstractmethod
+from typing import List, Sequence
+import numpy as np
+from app.config import get_settings
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Words that appear in almost every query and document and carry no topic
+STOP_WORDS = frozenset({
+    "a", "an", "and", "at", "for", "in", "is", "of", "on", "or", "the", "to", "with",
+    "what", "should", "i", "my", "do", "this", "stage", "guidance", "scientific"
+})
+
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length (zero rows stay zero)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return (matrix / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+class Embedder(ABC):
+    """
+    Turns text into unit vectors; cosine similarity is a dot product.
+    """
+
+    name: str
+
+    @property
+    @abstractmethod
+    def dimension(self) -> int:
+        """Vector size"""
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed texts into an (n, dimension) float32 matrix of unit vectors"""
+
+
+class HashingEmbedder(Embedder):
+    """Feature-hashing embedder (no model, CPU only)"""
+
+    def __init__(self, dimension: int):
+        """
+        Initialize the embedder.
+
+        Args:
+            dimension: Number of hash buckets (vector size)
+        """
+        self._dimension = dimension
+        self.name = f"hashing-{dimension}"
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    @staticmethod
+    def features(text: str) -> List[str]:
+        """Word unigrams and bigrams plus character trigrams of each word"""
+        words = [word for word in TOKEN_PATTERN.findall(text.lower()) if word not in STOP_WORDS]
+        features = words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+        for word in words:
+            padded = f"<{word}>"
+            features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+        return features
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self._dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self.features(text):
+                digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+                matrix[row, digest % self._dimension] += 1.0 if digest >> 63 else -1.0
+        # Dampen repeated features so long documents are not dominated by one word
+        return normalize(np.sign(matrix) * np.log1p(np.abs(matrix)))
+
+
+class SentenceTransformerEmbedder(Embedder):
+    """sentence-transformers model on CPU, loaded on first use"""
+
+    def __init__(self, model_name: str):
+        """
+        Initialize the embedder.
+
+        Args:
+            model_name: sentence-transformers model name or path
+
+        Raises:
+            ValueError: If sentence-transformers is not installed
+        """
+        try:
+            import sentence_transformers  # noqa: F401
+        except ImportError:
+            raise ValueError(f"RAG_EMBEDDING_MODEL={model_name} requires the 'sentence-transformers' package")
+        self.name = model_name
+        self._model = None
+
+    def _load(self):
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.name, device="cpu")
+        return self._model
+
+    @property
+    def dimension(self) -> int:
+        return self._load().get_sentence_embedding_dimension()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self._load().encode(list(texts), convert_to_numpy=True, normalize_embeddings=True)
+        return vectors.astype(np.float32)
+
+
+def create_embedder() -> Embedder:
+    """
+    Build the embedder selected by `rag_embedding_model` in settings.
+    The hashing embedder matches `pinecone_dimension` when Pinecone is the backend.
+
+    Returns:
+        Embedder instance
+    """
+    settings = get_settings()
+    if settings.rag_embedding_model == "hashing":
+        dimension = settings.pinecone_dimension if settings.rag_backend == "pinecone" else settings.rag_embedding_dimension
+        return HashingEmbedder(dimension)
+    return SentenceTransformerEmbedder(settings.rag_embedding_model)
@@ -1,19 +1,264 @@
+"""
+Retrieval-augmented knowledge for CropMind AI.
+
+`RAGService.get_relevant_advice` embeds "Scientific guidance for {crop} at
+{stage} stage. {query}", narrows the corpus to documents for that crop and
+stage (or for any crop/stage), and returns the top `pinecone_top_k` passages
+as the knowledge context for the Action Planner. With the local backend the
+corpus is embedded on first use and again whenever the crop configuration or
+the `RAG_CORPUS_PATH` file changes; with Pinecone it is ingested by
+`python -m app.jobs.rag_ingest`, which publishes the new index version in the
+shared cache for every worker to pick up. Query embeddings and results are
+cached per index version (retrieval_cache.py).
+"""
+import asyncio
+import hashlib
 import os
-from pinecone import Pinecone
+import time
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from app.config import get_settings
+from app.services.crop_config_loader import get_crop_loader
+from app.services.metrics import metrics
+from app.services.cache import SingleFlight, get_shared_cache
+from app.services.rag.backends import Match, VectorBackend, create_vector_backend
+from app.services.rag.corpus import Document, build_corpus
+from app.services.rag.embeddings import Embedder, create_embedder
+from app.services.rag.retrieval_cache import RetrievalCache, ResultKey, normalize_query
+
+INDEX_VERSION_KEY = "rag:index_version"  # Shared cache key holding the last ingested remote index version
+INDEX_VERSION_TTL = 365 * 86400
+
 
 class RAGService:
-    def __init__(self):
-        self.pc = Pinecone(api_key=os.environ.get("PINECONE_API_KEY"))
-        self.index_name = os.environ.get("PINECONE_INDEX", "cropmind")
-        self.index_host = os.environ.get("PINECONE_HOST")
-        self.index = self.pc.Index(name=self.index_name, host=self.index_host)
-
-    async def get_relevant_advice(self, crop: str, stage: str, query: str = ""):
-        # Industry grade RAG retrieval logic
-        # For now return placeholder grounded context as requested if index empty
-        search_context = f"Scientific guidance for {crop} at {stage} stage. {query}"
-        
-        # Real implementation would involve embedding search_context and querying Pinecone
-        # return self.index.query(vector=embeddings, top_k=3, include_metadata=True)
-        
+    """
+    Embeds queries and retrieves crop/stage-filtered passages from a vector backend.
+    """
+
+    def __init__(self, backend: Optional[VectorBackend] = None, embedder: Optional[Embedder] = None):
+        """
+        Initialize the service (nothing is embedded or connected until first use).
+
+        Args:
+            backend: Vector backend (defaults to the one selected in settings)
+            embedder: Text embedder (defaults to the one selected in settings)
+        """
+        self.settings = get_settings()
+        self.backend = backend or create_vector_backend()
+        self.embedder = embedder or create_embedder()
+        self.top_k = self.settings.pinecone_top_k
+        self._ingest_lock = asyncio.Lock()
+        self._corpus_fingerprint: Optional[str] = None  # Corpus sources the index version was derived from
+        self.index_version = ""
+        self._shared = get_shared_cache()
+        self._version_checked_at = 0.0
+        self.cache = RetrievalCache()
+        self._single_flight = SingleFlight()
+        self.documents = 0
+        self.queries = 0
+        self.errors = 0
+
+    @staticmethod
+    def fallback_advice(crop: str, stage: str) -> str:
+        """Generic context used when nothing relevant is retrieved"""
         return f"Standard agricultural manual recommends focus on irrigation and nitrogen-based fertilizer during the {stage} phase of {crop}."
+
+    def corpus_version(self, documents: Sequence[Document]) -> str:
+        """Hash of the embedder and documents; identical corpora get the same version in every worker"""
+        digest = hashlib.sha256(self.embedder.name.encode("utf-8"))
+        for doc in documents:
+            digest.update("\x1f".join(doc).encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def source_fingerprint(self) -> str:
+        """Crop config fingerprint plus the corpus file's size and modification time"""
+        fingerprint = get_crop_loader(self.settings.crop_config_path).fingerprint
+        path = self.settings.rag_corpus_path
+        if path:
+            try:
+                stat = os.stat(path)
+                fingerprint += f":{stat.st_size}:{stat.st_mtime_ns}"
+            except OSError:
+                fingerprint += ":missing"
+        return fingerprint
+
+    def _set_index_version(self, version: str) -> None:
+        """Switch to a new index version and drop cached embeddings and results"""
+        if version != self.index_version:
+            self.index_version = version
+            self.cache.clear()
+
+    async def ingest(self, documents: Optional[Sequence[Document]] = None) -> int:
+        """
+        Embed documents and store them in the backend.
+
+        Args:
+            documents: Documents to store (defaults to the built-in corpus plus RAG_CORPUS_PATH)
+
+        Returns:
+            Number of documents ingested
+        """
+        fingerprint = self.source_fingerprint()
+        if documents is None:
+            documents = build_corpus(get_crop_loader(self.settings.crop_config_path), self.settings.rag_corpus_path)
+        vectors = await asyncio.to_thread(self.embedder.embed, [doc.text for doc in documents])
+        await self.backend.ingest(documents, vectors)
+        self._corpus_fingerprint = fingerprint
+        self._set_index_version(self.corpus_version(documents))
+        self.documents = len(documents)
+        if not self.backend.is_local and self._shared is not None:
+            # Workers serving queries pick this up instead of deriving the version themselves
+            await self._shared.set(INDEX_VERSION_KEY, self.index_version, ttl=INDEX_VERSION_TTL)
+        return len(documents)
+
+    async def _ensure_ingested(self) -> None:
+        """
+        Build the local index on first use and after crop config or corpus file changes.
+        Remote indexes are filled by the ingest job: their version is the one it
+        published in the shared cache (checked every `rag_index_version_check_interval`
+        seconds), or derived from the corpus sources without a shared cache.
+        """
+        fingerprint = self.source_fingerprint()
+        if self._corpus_fingerprint != fingerprint:
+            async with self._ingest_lock:
+                if self._corpus_fingerprint != fingerprint:
+                    if self.backend.is_local:
+                        await self.ingest()
+                    else:
+                        crop_loader = get_crop_loader(self.settings.crop_config_path)
+                        self._set_index_version(self.corpus_version(build_corpus(crop_loader, self.settings.rag_corpus_path)))
+                        self._corpus_fingerprint = fingerprint
+                        self._version_checked_at = 0.0
+
+        if self.backend.is_local or self._shared is None:
+            return
+        now = time.monotonic()
+        if now - self._version_checked_at < self.settings.rag_index_version_check_interval:
+            return
+        self._version_checked_at = now
+        published = await self._shared.get(INDEX_VERSION_KEY)
+        if published:
+            self._set_index_version(published)
+
+    def resolve_stage(self, crop: str, stage: str) -> Optional[str]:
+        """
+        Stage id for a stage id or label of the crop (None if it is not a known stage).
+
+        Args:
+            crop: Crop type
+            stage: Stage id or label, e.g. "vegetative" or "Vegetative Growth"
+
+        Returns:
+            Stage id or None
+        """
+        try:
+            stages = get_crop_loader(self.settings.crop_config_path).get_crop_stages(crop)
+        except ValueError:
+            return None
+        wanted = stage.strip().lower()
+        for entry in stages:
+            if wanted in (entry["id"], entry["label"].lower()):
+                return entry["id"]
+        return None
+
+    async def retrieve(self, crop: str, stage: str, query: str = "") -> List[Match]:
+        """
+        Top passages for a crop, stage and optional question.
+
+        Args:
+            crop: Crop type
+            stage: Stage id or label (unknown stages filter by crop only)
+            query: Farmer's question, if any
+
+        Returns:
+            Matches, best first
+        """
+        await self._ensure_ingested()
+        search_context = normalize_query(f"Scientific guidance for {crop} at {stage} stage. {query}")
+        crop = crop.lower()
+        stage_id = self.resolve_stage(crop, stage)
+        key = self.cache.result_key(self.index_version, crop, stage_id, search_context, self.top_k)
+
+        matches = await self.cache.get_results(key)
+        if matches is not None:
+            return matches
+        # Farmers in the same stage ask the same thing at once; search once per key
+        return await self._single_flight.do(key, lambda: self._search(key, search_context, crop, stage_id))
+
+    async def embed_query(self, text: str) -> np.ndarray:
+        """
+        Embedding for normalized query text, from the embedding cache when possible.
+
+        Args:
+            text: Normalized query text
+
+        Returns:
+            Query unit vector
+        """
+        vector = self.cache.get_embedding(self.embedder.name, text)
+        if vector is None:
+            vector = (await asyncio.to_thread(self.embedder.embed, [text]))[0]
+            self.cache.put_embedding(self.embedder.name, text, vector)
+        return vector
+
+    async def _search(self, key: ResultKey, text: str, crop: str, stage_id: Optional[str]) -> List[Match]:
+        """Embed, query the backend and cache the results"""
+        matches = await self.backend.query(await self.embed_query(text), self.top_k, crop, stage_id)
+        await self.cache.put_results(key, matches)
+        return matches
+
+    async def get_relevant_advice(self, crop: str, stage: str, query: str = "") -> str:
+        """
+        Knowledge context for the Action Planner.
+
+        Args:
+            crop: Crop type
+            stage: Stage id or label
+            query: Farmer's question, if any
+
+        Returns:
+            Retrieved passages, one per line (generic guidance if none match)
+        """
+        started = time.perf_counter()
+        self.queries += 1
+        try:
+            matches = await self.retrieve(crop, stage, query)
+        except Exception as e:
+            # Retrieval problems degrade to generic context instead of failing the request
+            self.errors += 1
+            print(f"✗ RAG retrieval failed: {e}")
+            matches = []
+        metrics.observe("rag.retrieve", time.perf_counter() - started)
+
+        if not matches:
+            return self.fallback_advice(crop, stage)
+        return "\n".join(f"- {match.text}" for match in matches)
+
+    def stats(self) -> Dict[str, Any]:
+        """Retrieval counters for diagnostics"""
+        return {
+            **self.backend.stats(),
+            "embedder": self.embedder.name,
+            "documents": self.documents,
+            "index_version": self.index_version,
+            **self.cache.stats(),
+            "queries": self.queries,
+            "errors": self.errors
+        }
+
+
+# Singleton instance
+_rag_service: Optional[RAGService] = None
+
+
+def get_rag_service() -> RAGService:
+    """
+    Get singleton RAG service instance.
+
+    Returns:
+        RAGService instance
+    """
+    global _rag_service
+    if _rag_service is None:
+        _rag_service = RAGService()
+    return _rag_service
@@ -0,0 +1,148 @@
+"""
+Embedding and retrieval-result caches for RAG.
+
+Dashboard and advice queries repeat the same text for every farmer in a crop
+stage, so both pipeline steps are cached:
+
+- query embeddings, keyed by (embedder, normalized text), in process;
+- retrieval results, keyed by (index version, crop, stage, normalized text,
+  top_k), in process with the shared cache backend (when configured) as a
+  second tier.
+
+Both caches are bounded LRU/TTL. The index version changes whenever the
+corpus is re-ingested, so older results stop matching; `clear` also drops
+the in-process entries.
+"""
+import hashlib
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.config import get_settings
+from app.services.cache import TTLCache, get_shared_cache
+from app.services.rag.backends import Match
+
+ResultKey = Tuple[str, str, str, str, int]  # (index version, crop, stage, normalized text, top_k)
+
+
+def normalize_query(text: str) -> str:
+    """Lower-case and collapse whitespace so trivially different queries share entries"""
+    return " ".join(text.lower().split())
+
+
+class RetrievalCache:
+    """
+    Caches query embeddings and top-k retrieval results.
+    """
+
+    def __init__(self):
+        """Initialize cache tiers from configuration"""
+        self.settings = get_settings()
+        self.enabled = self.settings.enable_rag_cache
+        self.result_ttl = self.settings.rag_result_cache_ttl
+        self._embeddings = TTLCache(
+            maxsize=self.settings.rag_embedding_cache_max_entries,
+            ttl=self.settings.rag_embedding_cache_ttl
+        )
+        self._results = TTLCache(maxsize=self.settings.rag_result_cache_max_entries, ttl=self.result_ttl)
+        self._shared = get_shared_cache()
+        self.embedding_hits = 0
+        self.embedding_misses = 0
+        self.result_hits = 0
+        self.shared_hits = 0
+        self.result_misses = 0
+
+    @staticmethod
+    def result_key(index_version: str, crop: str, stage: Optional[str], text: str, top_k: int) -> ResultKey:
+        return (index_version, crop, stage or "", text, top_k)
+
+    @staticmethod
+    def _shared_key(key: ResultKey) -> str:
+        index_version, crop, stage, text, top_k = key
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+        return f"rag_result:{index_version}:{crop}:{stage}:{top_k}:{text_hash}"
+
+    def get_embedding(self, embedder: str, text: str) -> Optional[np.ndarray]:
+        """
+        Look up a query embedding.
+
+        Args:
+            embedder: Embedder name
+            text: Normalized query text
+
+        Returns:
+            Read-only vector or None on a miss
+        """
+        if not self.enabled:
+            return None
+        vector = self._embeddings.get((embedder, text))
+        if vector is None:
+            self.embedding_misses += 1
+        else:
+            self.embedding_hits += 1
+        return vector
+
+    def put_embedding(self, embedder: str, text: str, vector: np.ndarray) -> None:
+        """Store a query embedding (shared between callers, so made read-only)"""
+        if not self.enabled:
+            return
+        vector.flags.writeable = False
+        self._embeddings.set((embedder, text), vector)
+
+    async def get_results(self, key: ResultKey) -> Optional[List[Match]]:
+        """
+        Look up retrieval results.
+
+        Args:
+            key: Key from `result_key`
+
+        Returns:
+            Matches or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        matches = self._results.get(key)
+        if matches is not None:
+            self.result_hits += 1
+            return matches
+
+        if self._shared is not None:
+            rows = await self._shared.get(self._shared_key(key))
+            if rows is not None:
+                matches = [Match(*row) for row in rows]
+                self._results.set(key, matches)
+                self.shared_hits += 1
+                return matches
+
+        self.result_misses += 1
+        return None
+
+    async def put_results(self, key: ResultKey, matches: List[Match]) -> None:
+        """
+        Store retrieval results.
+
+        Args:
+            key: Key from `result_key`
+            matches: Retrieved matches
+        """
+        if not self.enabled:
+            return
+        self._results.set(key, matches)
+        if self._shared is not None:
+            await self._shared.set(self._shared_key(key), [list(match) for match in matches], ttl=self.result_ttl)
+
+    def clear(self) -> None:
+        """Drop in-process entries after the corpus is re-ingested"""
+        self._embeddings.clear()
+        self._results.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for diagnostics"""
+        return {
+            "embedding_hits": self.embedding_hits,
+            "embedding_misses": self.embedding_misses,
+            "embedding_size": len(self._embeddings),
+            "result_hits": self.result_hits,
+            "result_shared_hits": self.shared_hits,
+            "result_misses": self.result_misses,
+            "result_size": len(self._results)
+        }
@@ -0,0 +1,148 @@
+"""
+In-process NumPy vector index for RAG retrieval.
+
+Vectors are unit length, so cosine similarity is one matrix-vector product.
+Every document carries a crop and a stage ("*" means any). A query is first
+narrowed to matching rows through precomputed postings, and only those rows
+are scored. In `ivf` mode the corpus is also clustered with spherical k-means;
+a query scores only the filtered rows in its `nprobe` nearest clusters.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+ANY = "*"  # Metadata value matching every crop or stage
+
+
+class VectorIndex:
+    """
+    Brute-force or IVF cosine index with crop/stage pre-filtering.
+    """
+
+    def __init__(self, mode: str = "brute", nlist: int = 64, nprobe: int = 8, kmeans_iterations: int = 10):
+        """
+        Initialize an empty index.
+
+        Args:
+            mode: "brute" (exact) or "ivf" (clustered)
+            nlist: Number of IVF clusters
+            nprobe: Clusters scanned per IVF query
+            kmeans_iterations: Lloyd iterations when building IVF clusters
+        """
+        self.mode = mode
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.kmeans_iterations = kmeans_iterations
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._crops = np.array([], dtype=object)
+        self._stages = np.array([], dtype=object)
+        self._postings: Dict[Tuple[str, str], np.ndarray] = {}
+        self._filtered: Dict[Tuple[Optional[str], Optional[str]], np.ndarray] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._matrix)
+
+    def build(self, vectors: np.ndarray, crops: Sequence[str], stages: Sequence[str]) -> None:
+        """
+        Replace the index contents.
+
+        Args:
+            vectors: (n, d) unit vectors; row i is document i
+            crops: Crop per document (ANY for all crops)
+            stages: Stage id per document (ANY for all stages)
+        """
+        self._matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+        self._crops = np.array(crops, dtype=object)
+        self._stages = np.array(stages, dtype=object)
+        self._postings = {}
+        for field, values in (("crop", self._crops), ("stage", self._stages)):
+            for value in np.unique(values) if len(values) else []:
+                self._postings[(field, value)] = np.flatnonzero(values == value)
+        self._filtered = {}
+
+        self._centroids = self._assignments = None
+        if self.mode == "ivf" and len(self._matrix) > self.nlist:
+            self._build_ivf()
+
+    def _build_ivf(self) -> None:
+        """Spherical k-means over the corpus"""
+        rng = np.random.default_rng(0)
+        centroids = self._matrix[rng.choice(len(self._matrix), self.nlist, replace=False)]
+        for _ in range(self.kmeans_iterations):
+            assignments = np.argmax(self._matrix @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, self._matrix)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Empty clusters keep their previous centroid
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+        self._centroids = centroids.astype(np.float32)
+        self._assignments = np.argmax(self._matrix @ self._centroids.T, axis=1)
+
+    def _rows(self, field: str, value: Optional[str]) -> Optional[np.ndarray]:
+        """Rows whose field equals value or ANY (None means no filter)"""
+        if value is None:
+            return None
+        empty = np.array([], dtype=np.int64)
+        return np.union1d(self._postings.get((field, value), empty), self._postings.get((field, ANY), empty))
+
+    def candidates(self, crop: Optional[str], stage: Optional[str]) -> np.ndarray:
+        """
+        Rows matching the crop and stage filters (memoized per filter pair).
+
+        Args:
+            crop: Crop to match, or None for any
+            stage: Stage id to match, or None for any
+
+        Returns:
+            Sorted row indices
+        """
+        key = (crop, stage)
+        rows = self._filtered.get(key)
+        if rows is None:
+            rows = np.arange(len(self._matrix))
+            for field, value in (("crop", crop), ("stage", stage)):
+                matching = self._rows(field, value)
+                if matching is not None:
+                    rows = np.intersect1d(rows, matching, assume_unique=True)
+            self._filtered[key] = rows
+        return rows
+
+    def search(self, vector: np.ndarray, top_k: int, crop: Optional[str] = None, stage: Optional[str] = None) -> List[Tuple[int, float]]:
+        """
+        Find the most similar documents among those matching the filters.
+
+        Args:
+            vector: Query unit vector
+            top_k: Number of results
+            crop: Crop filter (None for any)
+            stage: Stage id filter (None for any)
+
+        Returns:
+            (row, score) pairs, best first
+        """
+        rows = self.candidates(crop, stage)
+        if self._centroids is not None and len(rows) > top_k:
+            probes = np.argsort(self._centroids @ vector)[-self.nprobe:]
+            probed = rows[np.isin(self._assignments[rows], probes)]
+            # Small filtered sets can miss the probed clusters entirely; fall back to exact
+            if len(probed) >= top_k:
+                rows = probed
+        if not len(rows) or top_k <= 0:
+            return []
+
+        scores = self._matrix[rows] @ vector
+        if len(rows) > top_k:
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            best = np.arange(len(rows))
+        best = best[np.argsort(-scores[best])]
+        return [(int(rows[i]), float(scores[i])) for i in best]
+
+    def stats(self) -> Dict[str, int]:
+        """Index size for diagnostics"""
+        return {
+            "documents": len(self._matrix),
+            "clusters": 0 if self._centroids is None else len(self._centroids),
+            "filters_cached": len(self._filtered)
+        }
@@ -0,0 +1,191 @@
+"""
+Per-user response cache with ETags for CropMind AI.
+
+Polled read endpoints (`/lifecycle/status`, `/dashboard/weather`,
+`/user/profile`) store their serialized JSON body here, tagged with the
+user's cache version, the endpoint's version and the calendar day. Mutating
+endpoints call `invalidate`, which bumps the user's version; writes that only
+affect one endpoint (new advice history for `/lifecycle/status`) bump that
+endpoint's version. Versions live in the shared cache backend when one is
+configured, so every worker sees them. With the in-process memory backend a
+worker cannot see another worker's invalidations, so entries then live at
+most `response_cache_local_ttl` seconds. Entries also stop matching when the
+day changes. Responses carry a content-hash ETag and `If-None-Match` is
+answered with 304.
+"""
+import datetime
+import hashlib
+import uuid
+from typing import Any, Dict, NamedTuple, Optional, Set, Tuple
+from fastapi import Request, Response
+from pydantic import BaseModel
+from app.config import get_settings
+from app.services.cache import TTLCache, get_shared_cache
+from app.services.metrics import metrics
+
+INITIAL_VERSION = "0"
+
+
+class CachedResponse(NamedTuple):
+    """Serialized JSON body and its ETag"""
+    body: bytes
+    etag: str
+
+    def to_response(self, request: Request) -> Response:
+        """
+        Build the HTTP response, answering a matching If-None-Match with 304.
+
+        Args:
+            request: Incoming request
+
+        Returns:
+            200 JSON response or empty 304 response
+        """
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        if_none_match = request.headers.get("if-none-match", "")
+        if self.etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match.strip() == "*":
+            metrics.incr("response_cache.not_modified")
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+class ResponseCache:
+    """
+    Caches serialized responses per (endpoint, user) behind a version and the day.
+    """
+
+    def __init__(self):
+        """Initialize the cache from configuration"""
+        self.settings = get_settings()
+        self.enabled = self.settings.enable_response_cache
+        self._shared = get_shared_cache()
+        self.ttl = self.settings.response_cache_ttl
+        if self._shared is None:
+            # Other workers' invalidations are invisible; keep entries short-lived
+            self.ttl = min(self.ttl, self.settings.response_cache_local_ttl)
+        self._entries = TTLCache(maxsize=self.settings.response_cache_max_entries, ttl=self.ttl)
+        # Versions must outlive entries so an expired version cannot revive a stale entry
+        self._version_ttl = self.ttl * 2
+        self._versions = TTLCache(maxsize=self.settings.response_cache_max_entries * 2, ttl=self._version_ttl)
+        self._namespaces: Set[str] = set()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _version_key(email: str, namespace: Optional[str] = None) -> str:
+        return f"response_version:{namespace}:{email}" if namespace else f"response_version:{email}"
+
+    async def _get_version(self, key: str) -> str:
+        if self._shared is not None:
+            return await self._shared.get(key) or INITIAL_VERSION
+        return self._versions.get(key) or INITIAL_VERSION
+
+    async def _bump_version(self, key: str) -> None:
+        new_version = uuid.uuid4().hex
+        if self._shared is not None:
+            await self._shared.set(key, new_version, ttl=self._version_ttl)
+        else:
+            self._versions.set(key, new_version)
+
+    async def version(self, email: str, namespace: Optional[str] = None) -> str:
+        """Current cache version for a user (combined with the endpoint's version when given)"""
+        user_version = await self._get_version(self._version_key(email))
+        if namespace is None:
+            return user_version
+        return f"{user_version}:{await self._get_version(self._version_key(email, namespace))}"
+
+    async def get(self, namespace: str, email: str) -> Tuple[Optional[CachedResponse], str]:
+        """
+        Look up a cached response.
+
+        Args:
+            namespace: Endpoint name
+            email: User email
+
+        Returns:
+            (cached response or None, version to pass to `put` on a miss)
+        """
+        if not self.enabled:
+            return None, INITIAL_VERSION
+
+        version = await self.version(email, namespace)
+
+        entry = self._entries.get((namespace, email))
+        if entry is not None:
+            entry_version, day, response = entry
+            if entry_version == version and day == datetime.date.today():
+                self.hits += 1
+                return response, version
+        self.misses += 1
+        return None, version
+
+    def put(self, namespace: str, email: str, version: str, payload: BaseModel, ttl: Optional[float] = None) -> CachedResponse:
+        """
+        Serialize and store a response.
+
+        Args:
+            namespace: Endpoint name
+            email: User email
+            version: Version returned by `get` before the response was built
+            payload: Response model
+            ttl: Entry lifetime (defaults to response_cache_ttl)
+
+        Returns:
+            CachedResponse for the payload
+        """
+        body = payload.model_dump_json().encode("utf-8")
+        response = CachedResponse(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        if self.enabled:
+            self._namespaces.add(namespace)
+            self._entries.set((namespace, email), (version, datetime.date.today(), response), ttl=min(ttl or self.ttl, self.ttl))
+        return response
+
+    async def invalidate(self, email: str) -> None:
+        """
+        Drop cached responses for a user after a mutation.
+
+        Args:
+            email: User email
+        """
+        for namespace in self._namespaces:
+            self._entries.delete((namespace, email))
+        await self._bump_version(self._version_key(email))
+
+    async def invalidate_namespace(self, namespace: str, email: str) -> None:
+        """
+        Drop one endpoint's cached response for a user.
+
+        Args:
+            namespace: Endpoint name
+            email: User email
+        """
+        self._entries.delete((namespace, email))
+        await self._bump_version(self._version_key(email, namespace))
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for diagnostics (hits only count current-version, same-day entries)"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "size": len(self._entries),
+            "evictions": self._entries.evictions
+        }
+
+
+# Singleton instance
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Get singleton response cache instance.
+
+    Returns:
+        ResponseCache instance
+    """
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
@@ -1,4 +1,5 @@
 # Weather service package
 from .weather_service import WeatherService, get_weather_service
+from .forecast import ForecastSeries
 
-__all__ = ["WeatherService", "get_weather_service"]
+__all__ = ["WeatherService", "get_weather_service", "ForecastSeries"]
@@ -0,0 +1,118 @@
+"""
+Compact multi-day forecast series for CropMind AI.
+
+The provider's 5-day / 3-hour forecast is stored per grid cell as parallel
+NumPy arrays instead of a list of dicts, so planner questions such as
+"rain in the next 24h?" or "max temperature this week?" are answered from
+memory with a few vector operations.
+"""
+import random
+import time
+from typing import Any, Dict, Optional
+import numpy as np
+
+
+class ForecastSeries:
+    """
+    Forecast time series for one location.
+    """
+
+    __slots__ = ("times", "temperature", "pop", "rain_mm")
+
+    def __init__(self, times: np.ndarray, temperature: np.ndarray, pop: np.ndarray, rain_mm: np.ndarray):
+        """
+        Initialize the series.
+
+        Args:
+            times: Step start times as Unix seconds (int64)
+            temperature: Temperature in Celsius (float32)
+            pop: Probability of precipitation 0-1 (float32)
+            rain_mm: Rain volume per step in mm (float32)
+        """
+        self.times = times
+        self.temperature = temperature
+        self.pop = pop
+        self.rain_mm = rain_mm
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def _window(self, hours: float, start_hours: float = 0.0, now: Optional[float] = None) -> np.ndarray:
+        """Boolean mask of steps starting within [now + start_hours, now + hours)"""
+        now = time.time() if now is None else now
+        return (self.times >= now + start_hours * 3600) & (self.times < now + hours * 3600)
+
+    def max_pop(self, hours: float, start_hours: float = 0.0, now: Optional[float] = None) -> float:
+        """Highest precipitation probability (0-1) in the window"""
+        values = self.pop[self._window(hours, start_hours, now)]
+        return float(values.max()) if values.size else 0.0
+
+    def rain_total(self, hours: float, start_hours: float = 0.0, now: Optional[float] = None) -> float:
+        """Total rain in mm expected in the window"""
+        return float(self.rain_mm[self._window(hours, start_hours, now)].sum())
+
+    def rain_expected(self, hours: float, min_pop: float = 0.5, start_hours: float = 0.0, now: Optional[float] = None) -> bool:
+        """Whether any step in the window has rain volume or pop >= min_pop"""
+        mask = self._window(hours, start_hours, now)
+        return bool(np.any((self.pop[mask] >= min_pop) | (self.rain_mm[mask] > 0)))
+
+    def max_temperature(self, days: float = 7, now: Optional[float] = None) -> Optional[float]:
+        """Highest forecast temperature in the next `days` days"""
+        values = self.temperature[self._window(days * 24, now=now)]
+        return round(float(values.max()), 1) if values.size else None
+
+    def min_temperature(self, days: float = 7, now: Optional[float] = None) -> Optional[float]:
+        """Lowest forecast temperature in the next `days` days"""
+        values = self.temperature[self._window(days * 24, now=now)]
+        return round(float(values.min()), 1) if values.size else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form for shared cache backends"""
+        return {
+            "times": self.times.tolist(),
+            "temperature": self.temperature.tolist(),
+            "pop": self.pop.tolist(),
+            "rain_mm": self.rain_mm.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ForecastSeries":
+        """Rebuild a series from `to_dict` output"""
+        return cls(
+            times=np.asarray(data["times"], dtype=np.int64),
+            temperature=np.asarray(data["temperature"], dtype=np.float32),
+            pop=np.asarray(data["pop"], dtype=np.float32),
+            rain_mm=np.asarray(data["rain_mm"], dtype=np.float32)
+        )
+
+    @classmethod
+    def from_openweathermap(cls, data: Dict[str, Any]) -> "ForecastSeries":
+        """
+        Parse an OpenWeatherMap `/forecast` response.
+
+        Args:
+            data: Raw API response
+
+        Returns:
+            ForecastSeries
+        """
+        steps = data.get("list", [])
+        return cls(
+            times=np.fromiter((step.get("dt", 0) for step in steps), dtype=np.int64, count=len(steps)),
+            temperature=np.fromiter((step.get("main", {}).get("temp", 0.0) for step in steps), dtype=np.float32, count=len(steps)),
+            pop=np.fromiter((step.get("pop", 0.0) for step in steps), dtype=np.float32, count=len(steps)),
+            rain_mm=np.fromiter((step.get("rain", {}).get("3h", 0.0) for step in steps), dtype=np.float32, count=len(steps))
+        )
+
+    @classmethod
+    def mock(cls, days: int = 5, step_hours: int = 3) -> "ForecastSeries":
+        """Random forecast for testing/fallback, shaped like the provider's series"""
+        count = days * 24 // step_hours
+        start = int(time.time()) // (step_hours * 3600) * (step_hours * 3600)
+        times = start + np.arange(count, dtype=np.int64) * step_hours * 3600
+        hour_of_day = (times % 86400) / 3600
+        base = random.uniform(24, 32)
+        temperature = (base + 5 * np.sin((hour_of_day - 9) / 24 * 2 * np.pi)).astype(np.float32)
+        pop = np.clip(np.random.default_rng().normal(0.3, 0.25, count), 0, 1).astype(np.float32)
+        rain_mm = np.where(pop > 0.6, pop * 4, 0).astype(np.float32)
+        return cls(times=times, temperature=temperature, pop=pop, rain_mm=rain_mm)
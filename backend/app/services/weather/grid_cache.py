@@ -0,0 +1,152 @@
+"""
+Grid-quantized weather cache for CropMind AI.
+
+Coordinates are snapped to a configurable grid (e.g. 0.05° ≈ 5.5 km) so nearby
+farms share one entry. Entries are stored as compact tuples in a bounded
+TTL/LRU cache, and concurrent misses for the same cell wait on a single fetch.
+When a shared cache backend is configured it acts as a second tier, so a cell
+fetched by one worker is reused by the others.
+"""
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+from app.services.cache import CacheBackend, SingleFlight, TTLCache
+
+
+class CompactWeather(NamedTuple):
+    """Weather reading stored as a tuple instead of a per-entry dict"""
+    temperature: float
+    feels_like: float
+    condition: str
+    description: str
+    humidity: int
+    wind_speed: float
+    rain_chance: int
+    rain_amount: Optional[str]
+    alert: Optional[str]
+
+
+class WeatherGridCache:
+    """
+    Bounded, stampede-safe weather cache keyed by grid cell.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, resolution: float, shared: Optional[CacheBackend] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of cells kept before LRU eviction
+            ttl: Entry time-to-live in seconds
+            resolution: Grid size in degrees
+            shared: Optional cross-process cache tier
+        """
+        self.resolution = resolution
+        self.ttl = ttl
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._shared = shared
+        self._single_flight = SingleFlight()
+        self.shared_hits = 0
+
+    def key_for(
+        self,
+        latitude: Optional[float],
+        longitude: Optional[float],
+        location: Optional[str] = None
+    ) -> Hashable:
+        """
+        Cache key for a request: the grid cell for coordinates, else the place name.
+
+        Returns:
+            ("cell", row, col) or ("place", name)
+        """
+        if latitude is not None and longitude is not None:
+            return ("cell", round(latitude / self.resolution), round(longitude / self.resolution))
+        return ("place", (location or "").strip().lower())
+
+    def cell_center(self, key: Hashable) -> Optional[Tuple[float, float]]:
+        """Representative (lat, lon) of a cell key, or None for place keys"""
+        if key[0] != "cell":
+            return None
+        return (round(key[1] * self.resolution, 6), round(key[2] * self.resolution, 6))
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """Return cached weather for key, or None if missing/expired"""
+        entry = self._entries.get(key)
+        return entry._asdict() if entry is not None else None
+
+    def set(self, key: Hashable, data: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """Store weather for key in the in-process tier"""
+        self._entries.set(key, CompactWeather(**{field: data.get(field) for field in CompactWeather._fields}), ttl=ttl)
+
+    async def store(self, key: Hashable, data: Dict[str, Any]) -> None:
+        """Store fresh weather for key in every tier"""
+        self.set(key, data)
+        if self._shared is not None:
+            entry = {"data": data, "expires_at": time.time() + self.ttl}
+            await self._shared.set(self._shared_key(key), entry, ttl=self.ttl)
+
+    @staticmethod
+    def _shared_key(key: Hashable) -> str:
+        return "weather:" + ":".join(str(part) for part in key)
+
+    def expires_at(self, key: Hashable) -> Optional[float]:
+        """Monotonic expiry time of a live entry, or None"""
+        return self._entries.expires_at(key)
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Return cached weather, fetching once per key on a miss.
+
+        Args:
+            key: Cache key from `key_for`
+            fetch: Coroutine function returning fresh weather data
+
+        Returns:
+            Weather data dictionary
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        async def load() -> Dict[str, Any]:
+            if self._shared is not None:
+                entry = await self._shared.get(self._shared_key(key))
+                remaining = entry["expires_at"] - time.time() if entry else 0
+                if remaining > 0:
+                    self.shared_hits += 1
+                    self.set(key, entry["data"], ttl=remaining)
+                    return entry["data"]
+            data = await fetch()
+            await self.store(key, data)
+            return data
+
+        return dict(await self._single_flight.do(key, load))
+
+    async def refresh(self, key: Hashable, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> None:
+        """
+        Fetch and store fresh weather for key, replacing any cached entry.
+        Shares the single-flight with `get_or_fetch`, so a refresh and a
+        concurrent miss for the same cell make one provider call.
+
+        Args:
+            key: Cache key from `key_for`
+            fetch: Coroutine function returning fresh weather data
+        """
+        async def load() -> Dict[str, Any]:
+            data = await fetch()
+            await self.store(key, data)
+            return data
+
+        await self._single_flight.do(key, load)
+
+    def purge_expired(self) -> int:
+        """Drop expired cells; returns the number removed"""
+        return self._entries.purge_expired()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction and coalescing counters for diagnostics"""
+        stats = self._entries.stats()
+        stats["resolution"] = self.resolution
+        stats["coalesced_fetches"] = self._single_flight.followers
+        stats["shared_hits"] = self.shared_hits
+        return stats
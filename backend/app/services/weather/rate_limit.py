@@ -0,0 +1,68 @@
+"""
+Token-bucket rate limiter for weather provider calls.
+Keeps request volume within the provider's quota.
+"""
+import asyncio
+import time
+from typing import Dict
+
+
+class TokenBucket:
+    """
+    Async token bucket: `rate` tokens per second, bursts up to `capacity`.
+    Background callers use `try_acquire`, which never waits and leaves
+    `reserve` tokens for live requests.
+    """
+
+    def __init__(self, rate: float, capacity: int, reserve: int = 0):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens held (burst size)
+            reserve: Tokens background callers may not take
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.reserve = reserve
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waits = 0
+        self.skipped = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available, then take it"""
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                self.waits += 1
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+    def try_acquire(self) -> bool:
+        """Take a token without waiting if more than `reserve` are available (background work)"""
+        self._refill()
+        if self._tokens < 1 + self.reserve:
+            self.skipped += 1
+            return False
+        self._tokens -= 1
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        """Current token level and throttling count"""
+        return {
+            "rate_per_second": self.rate,
+            "capacity": self.capacity,
+            "tokens": round(self._tokens, 2),
+            "reserve": self.reserve,
+            "throttled": self.waits,
+            "background_skipped": self.skipped
+        }
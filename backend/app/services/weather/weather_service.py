@@ -4,10 +4,15 @@ Integrates with real weather APIs (OpenWeatherMap) to replace mock data.
 Falls back to mock data if API is not configured.
 """
 import httpx
+import importlib.util
 import random
+import time
 from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
 from app.config import get_settings
+from app.services.weather.grid_cache import WeatherGridCache
+from app.services.weather.rate_limit import TokenBucket
+from app.services.weather.forecast import ForecastSeries
+from app.services.cache import SingleFlight, TTLCache, get_shared_cache
 
 
 class WeatherService:
@@ -23,7 +28,167 @@ class WeatherService:
         self.api_endpoint = self.settings.weather_api_endpoint
         self.provider = self.settings.weather_api_provider
         self.cache_ttl = self.settings.weather_cache_ttl
-        self._cache: Dict[str, tuple[Dict[str, Any], datetime]] = {}
+        self._cache = WeatherGridCache(
+            maxsize=self.settings.weather_cache_max_entries,
+            ttl=self.cache_ttl,
+            resolution=self.settings.weather_grid_resolution,
+            shared=get_shared_cache()
+        )
+        self.forecast_ttl = self.settings.weather_forecast_ttl
+        self._forecasts = TTLCache(
+            maxsize=self.settings.weather_forecast_max_entries,
+            ttl=self.forecast_ttl
+        )
+        self._forecast_flight = SingleFlight()
+        self._shared = get_shared_cache()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._requests = 0
+        self.rate_limiter = TokenBucket(
+            rate=self.settings.weather_api_rate_limit_per_minute / 60,
+            capacity=self.settings.weather_api_burst,
+            reserve=self.settings.weather_api_reserve
+        )
+    
+    async def startup(self) -> None:
+        """Open the shared provider HTTP client (called on app startup)"""
+        self._get_client()
+    
+    async def aclose(self) -> None:
+        """Close the shared provider HTTP client (called on app shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Get the long-lived, keep-alive HTTP client for the weather provider.
+        Created lazily so CLI jobs work without the app lifecycle hooks.
+        
+        Returns:
+            Shared httpx.AsyncClient
+        """
+        if self._client is None:
+            http2 = self.settings.weather_http2
+            if http2 and importlib.util.find_spec("h2") is None:
+                print("WEATHER_HTTP2 is enabled but the 'h2' package is not installed. Using HTTP/1.1.")
+                http2 = False
+            self._client = httpx.AsyncClient(
+                base_url=self.api_endpoint,
+                timeout=self.settings.weather_http_timeout,
+                limits=httpx.Limits(
+                    max_connections=self.settings.weather_http_max_connections,
+                    max_keepalive_connections=self.settings.weather_http_max_keepalive,
+                    keepalive_expiry=self.settings.weather_http_keepalive_expiry
+                ),
+                http2=http2
+            )
+        return self._client
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Connection pool diagnostics.
+        
+        Returns:
+            Pool limits, open/idle connection counts and request total
+        """
+        stats = {
+            "open": self._client is not None,
+            "http2": bool(self._client and self.settings.weather_http2 and importlib.util.find_spec("h2")),
+            "max_connections": self.settings.weather_http_max_connections,
+            "max_keepalive_connections": self.settings.weather_http_max_keepalive,
+            "requests": self._requests
+        }
+        # httpx keeps its connection pool on the transport; read it defensively
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is not None:
+            stats["connections"] = len(connections)
+            stats["idle_connections"] = sum(1 for conn in connections if conn.is_idle())
+        return stats
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Weather cache diagnostics"""
+        stats = self._cache.stats()
+        stats["rate_limit"] = self.rate_limiter.stats()
+        return stats
+    
+    @property
+    def uses_real_api(self) -> bool:
+        """Whether readings come from the provider rather than mock data"""
+        return self.settings.enable_weather_api and bool(self.api_key)
+    
+    def cell_key(self, latitude: float, longitude: float):
+        """Grid cell cache key for coordinates"""
+        return self._cache.key_for(latitude, longitude)
+    
+    def needs_refresh(self, cache_key, ahead_seconds: float) -> bool:
+        """
+        Whether a cached cell is missing or expires within `ahead_seconds`.
+        
+        Args:
+            cache_key: Grid cell key
+            ahead_seconds: Refresh horizon in seconds
+        
+        Returns:
+            True if the cell should be fetched again
+        """
+        expires_at = self._cache.expires_at(cache_key)
+        return expires_at is None or expires_at - time.monotonic() < ahead_seconds
+    
+    async def refresh_cell(self, cache_key) -> bool:
+        """
+        Fetch fresh weather for a grid cell and store it, replacing any cached reading.
+        Background work: skipped without waiting when only the rate limiter's
+        reserve for live requests is left.
+        
+        Args:
+            cache_key: Grid cell key
+        
+        Returns:
+            False if skipped for lack of quota
+        """
+        if not self.rate_limiter.try_acquire():
+            return False
+        await self._cache.refresh(cache_key, lambda: self._fetch_cell(cache_key, None, rate_limited=False))
+        return True
+    
+    def needs_forecast_refresh(self, cache_key, ahead_seconds: float) -> bool:
+        """
+        Whether a cell's forecast series is missing or expires within `ahead_seconds`.
+        
+        Args:
+            cache_key: Grid cell key
+            ahead_seconds: Refresh horizon in seconds
+        
+        Returns:
+            True if the forecast should be fetched again
+        """
+        expires_at = self._forecasts.expires_at(cache_key)
+        return expires_at is None or expires_at - time.monotonic() < ahead_seconds
+    
+    async def refresh_forecast(self, cache_key) -> bool:
+        """
+        Fetch a fresh forecast series for a grid cell and store it in every tier.
+        Same quota rule as `refresh_cell`, and shares the forecast single-flight
+        with `get_forecast`.
+        
+        Args:
+            cache_key: Grid cell key
+        
+        Returns:
+            False if skipped for lack of quota
+        """
+        if not self.rate_limiter.try_acquire():
+            return False
+        await self._forecast_flight.do(
+            cache_key,
+            lambda: self._load_forecast(cache_key, None, rate_limited=False, refresh=True)
+        )
+        return True
+    
+    def purge_expired(self) -> int:
+        """Drop expired cells from the cache"""
+        return self._cache.purge_expired()
     
     async def get_weather(
         self,
@@ -43,7 +208,7 @@ class WeatherService:
             Dictionary with weather data
         """
         # If API is enabled and configured, use real API
-        if self.settings.enable_weather_api and self.api_key:
+        if self.uses_real_api:
             return await self._get_real_weather(latitude, longitude, location)
         
         # Otherwise fall back to mock data
@@ -66,32 +231,147 @@ class WeatherService:
         Returns:
             Parsed weather data
         """
-        # Check cache first
-        cache_key = f"{latitude}_{longitude}_{location}"
-        if cache_key in self._cache:
-            cached_data, cached_time = self._cache[cache_key]
-            if datetime.now() - cached_time < timedelta(seconds=self.cache_ttl):
-                return cached_data
+        # Nearby farms share a grid cell; concurrent misses wait on one fetch
+        cache_key = self._cache.key_for(latitude, longitude, location)
         
         try:
-            if self.provider == "openweathermap":
-                data = await self._fetch_openweathermap(latitude, longitude, location)
-            else:
-                raise ValueError(f"Unsupported weather provider: {self.provider}")
-            
-            # Cache the result
-            self._cache[cache_key] = (data, datetime.now())
-            return data
-            
+            data = await self._cache.get_or_fetch(cache_key, lambda: self._fetch_cell(cache_key, location))
         except Exception as e:
             print(f"Weather API error: {e}. Falling back to mock data.")
             return self._get_mock_weather()
+        
+        # Replace the cloud-cover rain estimate with the forecast when available
+        try:
+            forecast = await self.get_forecast(latitude, longitude, location)
+        except Exception as e:
+            print(f"Weather forecast error: {e}. Using current conditions only.")
+            return data
+        
+        data["rain_chance"] = int(round(forecast.max_pop(24) * 100))
+        data["alert"] = self._generate_alert(data["rain_chance"], data["temperature"], forecast)
+        return data
+    
+    async def get_forecast(
+        self,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        location: Optional[str] = None
+    ) -> ForecastSeries:
+        """
+        Get the 5-day / 3-hour forecast for a location.
+        Series are cached per grid cell with their own TTL.
+        
+        Args:
+            latitude: Latitude coordinate
+            longitude: Longitude coordinate
+            location: Location name (alternative to lat/lon)
+        
+        Returns:
+            ForecastSeries (mock series when the API is not configured)
+        """
+        cache_key = self._cache.key_for(latitude, longitude, location)
+        series = self._forecasts.get(cache_key)
+        if series is not None:
+            return series
+        return await self._forecast_flight.do(cache_key, lambda: self._load_forecast(cache_key, location))
+    
+    async def _load_forecast(
+        self,
+        cache_key,
+        location: Optional[str],
+        rate_limited: bool = True,
+        refresh: bool = False
+    ) -> ForecastSeries:
+        """
+        Fetch a forecast series on a cache miss and store it in every tier.
+        `refresh` skips the shared tier (it holds the entry being replaced);
+        `rate_limited=False` when the caller already took a rate-limiter token.
+        """
+        if not self.uses_real_api:
+            series = ForecastSeries.mock()
+            self._forecasts.set(cache_key, series)
+            return series
+        
+        shared_key = "forecast:" + ":".join(str(part) for part in cache_key)
+        if self._shared is not None and not refresh:
+            entry = await self._shared.get(shared_key)
+            remaining = entry["expires_at"] - time.time() if entry else 0
+            if remaining > 0:
+                series = ForecastSeries.from_dict(entry["series"])
+                self._forecasts.set(cache_key, series, ttl=remaining)
+                return series
+        
+        center = self._cache.cell_center(cache_key)
+        latitude, longitude = center if center else (None, None)
+        if self.provider == "openweathermap":
+            series = await self._fetch_openweathermap_forecast(latitude, longitude, location, rate_limited)
+        else:
+            raise ValueError(f"Unsupported weather provider: {self.provider}")
+        
+        self._forecasts.set(cache_key, series)
+        if self._shared is not None:
+            entry = {"series": series.to_dict(), "expires_at": time.time() + self.forecast_ttl}
+            await self._shared.set(shared_key, entry, ttl=self.forecast_ttl)
+        return series
+    
+    async def rain_expected(self, latitude: Optional[float], longitude: Optional[float], hours: int = 24) -> bool:
+        """
+        Whether rain is expected at a location within the next `hours` hours.
+        
+        Args:
+            latitude: Latitude coordinate
+            longitude: Longitude coordinate
+            hours: Look-ahead window (e.g. 24 or 48)
+        
+        Returns:
+            True if any forecast step in the window is likely to bring rain
+        """
+        forecast = await self.get_forecast(latitude, longitude)
+        return forecast.rain_expected(hours, min_pop=self.settings.weather_rain_probability_threshold)
+    
+    async def max_temperature(self, latitude: Optional[float], longitude: Optional[float], days: int = 7) -> Optional[float]:
+        """
+        Highest forecast temperature at a location over the next `days` days.
+        The provider forecast covers 5 days, so longer windows are capped at that.
+        
+        Args:
+            latitude: Latitude coordinate
+            longitude: Longitude coordinate
+            days: Look-ahead window in days
+        
+        Returns:
+            Temperature in Celsius, or None if the forecast is empty
+        """
+        forecast = await self.get_forecast(latitude, longitude)
+        return forecast.max_temperature(days)
+    
+    async def _fetch_cell(self, cache_key, location: Optional[str], rate_limited: bool = True) -> Dict[str, Any]:
+        """
+        Fetch weather for a cache key from the configured provider.
+        Grid cells are fetched at the cell center so every farm in the cell
+        gets the same reading.
+        
+        Args:
+            cache_key: Key from the grid cache
+            location: Location name used when no coordinates are available
+            rate_limited: Wait for a rate-limiter token (False when the caller already took one)
+        
+        Returns:
+            Parsed weather data
+        """
+        center = self._cache.cell_center(cache_key)
+        latitude, longitude = center if center else (None, None)
+        
+        if self.provider == "openweathermap":
+            return await self._fetch_openweathermap(latitude, longitude, location, rate_limited)
+        raise ValueError(f"Unsupported weather provider: {self.provider}")
     
     async def _fetch_openweathermap(
         self,
         latitude: Optional[float],
         longitude: Optional[float],
-        location: Optional[str]
+        location: Optional[str],
+        rate_limited: bool = True
     ) -> Dict[str, Any]:
         """
         Fetch weather from OpenWeatherMap API.
@@ -100,6 +380,7 @@ class WeatherService:
             latitude: Latitude
             longitude: Longitude
             location: Location name
+            rate_limited: Wait for a rate-limiter token first
         
         Returns:
             Parsed weather data
@@ -118,16 +399,55 @@ class WeatherService:
         else:
             raise ValueError("Either lat/lon or location must be provided")
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(
-                f"{self.api_endpoint}/weather",
-                params=params
-            )
-            response.raise_for_status()
-            data = response.json()
+        if rate_limited:
+            await self.rate_limiter.acquire()
+        self._requests += 1
+        response = await self._get_client().get("/weather", params=params)
+        response.raise_for_status()
+        data = response.json()
         
         return self._parse_openweathermap_response(data)
     
+    async def _fetch_openweathermap_forecast(
+        self,
+        latitude: Optional[float],
+        longitude: Optional[float],
+        location: Optional[str],
+        rate_limited: bool = True
+    ) -> ForecastSeries:
+        """
+        Fetch the 5-day / 3-hour forecast from OpenWeatherMap API.
+        
+        Args:
+            latitude: Latitude
+            longitude: Longitude
+            location: Location name
+            rate_limited: Wait for a rate-limiter token first
+        
+        Returns:
+            Parsed forecast series
+        """
+        params = {
+            "appid": self.api_key,
+            "units": "metric"  # Celsius
+        }
+        
+        if latitude is not None and longitude is not None:
+            params["lat"] = latitude
+            params["lon"] = longitude
+        elif location:
+            params["q"] = location
+        else:
+            raise ValueError("Either lat/lon or location must be provided")
+        
+        if rate_limited:
+            await self.rate_limiter.acquire()
+        self._requests += 1
+        response = await self._get_client().get("/forecast", params=params)
+        response.raise_for_status()
+        
+        return ForecastSeries.from_openweathermap(response.json())
+    
     def _parse_openweathermap_response(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Parse OpenWeatherMap API response into standard format.
@@ -143,8 +463,8 @@ class WeatherService:
         wind = data.get("wind", {})
         rain = data.get("rain", {})
         
-        # Calculate rain probability (OpenWeatherMap doesn't provide this directly)
-        # Use cloudiness and rain amount as proxy
+        # Current conditions carry no rain probability; use cloudiness and rain
+        # amount as a proxy until the forecast overrides it in _get_real_weather
         clouds = data.get("clouds", {}).get("all", 0)
         rain_1h = rain.get("1h", 0)
         rain_chance = min(clouds, 100)  # Simple approximation
@@ -163,13 +483,14 @@ class WeatherService:
             "alert": self._generate_alert(rain_chance, main.get("temp", 0))
         }
     
-    def _generate_alert(self, rain_chance: int, temperature: float) -> Optional[str]:
+    def _generate_alert(self, rain_chance: int, temperature: float, forecast: Optional[ForecastSeries] = None) -> Optional[str]:
         """
         Generate weather alerts based on conditions.
         
         Args:
             rain_chance: Rain probability percentage
             temperature: Temperature in Celsius
+            forecast: Optional forecast series for look-ahead alerts
         
         Returns:
             Alert message or None
@@ -180,6 +501,8 @@ class WeatherService:
             alerts.append("Heavy rain expected")
         elif rain_chance > 50:
             alerts.append("Rain likely today")
+        elif forecast is not None and forecast.rain_expected(48, min_pop=self.settings.weather_rain_probability_threshold, start_hours=24):
+            alerts.append("Rain Expected Tomorrow")
         
         if temperature > 40:
             alerts.append("Extreme heat warning")
@@ -0,0 +1,301 @@
+"""
+Write-behind buffer for CropMind AI.
+
+`/dashboard/summary` records an `advice_history` row and refreshes the farm's
+`farm_states` row on every view. Instead of committing inside the request,
+those writes are queued in-process and flushed in batches when the queue
+reaches `write_behind_batch_size` or every `write_behind_flush_interval`
+seconds, whichever comes first. Several state updates for the same farm
+collapse into one. Written advice history invalidates the farmer's cached
+`/lifecycle/status` response, which embeds it. History inserts and state updates are written in separate
+transactions. When a batch fails, its rows are retried one by one so a bad row
+cannot block the rest; a row that fails `write_behind_max_attempts` times is
+dropped and logged. Connection errors requeue the batch without counting
+attempts. The buffer is flushed on graceful shutdown; writes still queued when
+a worker is killed are lost.
+"""
+import asyncio
+import datetime
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from sqlalchemy import insert, update
+from sqlalchemy.exc import InterfaceError, OperationalError
+from app.config import get_settings
+from app.db import AsyncSessionLocal
+from app.models.database import AdviceHistory, FarmState
+from app.services.metrics import metrics
+from app.services.response_cache import get_response_cache
+
+ATTEMPTS = "_attempts"  # Failed write attempts carried on a queued row (not a column)
+EMAIL = "_email"  # Farmer whose cached responses the row invalidates (not a column)
+CONNECTION_ERRORS = (OperationalError, InterfaceError, OSError)  # Database unreachable: retry later, do not count
+
+
+class WriteBehindBuffer:
+    """
+    Queues advice history inserts and farm state updates and writes them in batches.
+    """
+
+    def __init__(self):
+        """Initialize an empty buffer from configuration"""
+        self.settings = get_settings()
+        self.batch_size = self.settings.write_behind_batch_size
+        self.flush_interval = self.settings.write_behind_flush_interval
+        self.max_pending = self.settings.write_behind_max_pending
+        self.max_attempts = self.settings.write_behind_max_attempts
+        self._history: List[Dict[str, Any]] = []
+        self._states: Dict[int, Dict[str, Any]] = {}  # FarmState id -> latest values
+        self._state_attempts: Dict[int, int] = {}  # FarmState id -> failed write attempts
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._flushes: Set[asyncio.Task] = set()
+        self.flushed_history = 0
+        self.flushed_states = 0
+        self.collapsed = 0
+        self.errors = 0
+        self.dropped = 0
+        self.poisoned = 0
+
+    def pending(self) -> int:
+        """Number of queued writes"""
+        return len(self._history) + len(self._states)
+
+    def add_advice(
+        self,
+        farm_id: int,
+        recommendation: str,
+        stage_at_time: str,
+        weather_summary: str,
+        email: Optional[str] = None
+    ) -> None:
+        """
+        Queue an advice_history insert.
+
+        Args:
+            farm_id: Farm profile ID
+            recommendation: Advice shown to the farmer
+            stage_at_time: Crop stage label
+            weather_summary: Weather context used for the advice
+            email: Farmer's email; their cached lifecycle response is invalidated once the row is written
+        """
+        if self.pending() >= self.max_pending:
+            self.dropped += 1
+            return
+        self._history.append({
+            "farm_id": farm_id,
+            "recommendation": recommendation,
+            "stage_at_time": stage_at_time,
+            "weather_summary": weather_summary,
+            "created_at": datetime.datetime.utcnow(),
+            EMAIL: email
+        })
+        self._maybe_flush()
+
+    def update_farm_state(self, state_id: int, **values: Any) -> None:
+        """
+        Queue a farm_states update; a newer update for the same row replaces it.
+
+        Args:
+            state_id: FarmState row ID
+            **values: Column values to set
+        """
+        values["updated_at"] = datetime.datetime.utcnow()
+        if state_id in self._states:
+            self.collapsed += 1
+            self._states[state_id].update(values)
+        elif self.pending() >= self.max_pending:
+            self.dropped += 1
+            return
+        else:
+            self._states[state_id] = values
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        """Start a background flush once the batch size is reached (one at a time)"""
+        if self.pending() < self.batch_size or self._flushes:
+            return
+        task = asyncio.get_running_loop().create_task(self.flush())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def flush(self) -> int:
+        """
+        Write everything queued so far: history in one transaction, states in another.
+
+        Returns:
+            Number of rows written
+        """
+        async with self._lock:
+            history, self._history = self._history, []
+            states, self._states = self._states, {}
+            if not history and not states:
+                return 0
+
+            started = time.perf_counter()
+            written = 0
+            if history:
+                rows = [{key: value for key, value in row.items() if key not in (ATTEMPTS, EMAIL)} for row in history]
+                done, failed, unreachable = await self._write(rows, self._insert_history)
+                self.flushed_history += done
+                written += done
+                not_written = set(failed) | set(unreachable)
+                emails = {row[EMAIL] for index, row in enumerate(history) if index not in not_written and row.get(EMAIL)}
+                response_cache = get_response_cache()
+                for email in emails:
+                    await response_cache.invalidate_namespace("lifecycle_status", email)
+                self._requeue_history([history[index] for index in failed], [history[index] for index in unreachable])
+            if states:
+                state_rows = [{"id": state_id, **values} for state_id, values in states.items()]
+                done, failed, unreachable = await self._write(state_rows, self._update_states)
+                self.flushed_states += done
+                written += done
+                failed_ids = [state_rows[index]["id"] for index in failed]
+                unreachable_ids = [state_rows[index]["id"] for index in unreachable]
+                for state_id in states.keys() - set(failed_ids) - set(unreachable_ids):
+                    self._state_attempts.pop(state_id, None)
+                self._requeue_states(states, failed_ids, unreachable_ids)
+
+            metrics.observe("write_behind.flush", time.perf_counter() - started)
+            return written
+
+    @staticmethod
+    async def _insert_history(rows: List[Dict[str, Any]]) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(AdviceHistory), rows)
+            await db.commit()
+
+    @staticmethod
+    async def _update_states(rows: List[Dict[str, Any]]) -> None:
+        async with AsyncSessionLocal() as db:
+            # Group by column set: executemany needs the same keys in every row
+            by_columns: Dict[tuple, List[Dict[str, Any]]] = {}
+            for row in rows:
+                by_columns.setdefault(tuple(sorted(row)), []).append(row)
+            for group in by_columns.values():
+                await db.execute(update(FarmState), group)
+            await db.commit()
+
+    async def _write(
+        self,
+        rows: List[Dict[str, Any]],
+        write: Callable[[List[Dict[str, Any]]], Awaitable[None]]
+    ) -> Tuple[int, List[int], List[int]]:
+        """
+        Write rows in one transaction, falling back to one transaction per row.
+
+        Args:
+            rows: Rows to write
+            write: Coroutine function writing a list of rows in its own transaction
+
+        Returns:
+            (rows written, indexes of rows that failed, indexes not tried because the database is unreachable)
+        """
+        try:
+            await write(rows)
+            return len(rows), [], []
+        except CONNECTION_ERRORS as e:
+            self.errors += 1
+            print(f"Write-behind flush failed, database unreachable: {e}")
+            return 0, [], list(range(len(rows)))
+        except Exception as e:
+            self.errors += 1
+            print(f"Write-behind batch failed, retrying rows one by one: {e}")
+
+        done = 0
+        failed = []
+        for index, row in enumerate(rows):
+            try:
+                await write([row])
+                done += 1
+            except CONNECTION_ERRORS as e:
+                print(f"Write-behind flush failed, database unreachable: {e}")
+                return done, failed, list(range(index, len(rows)))
+            except Exception as e:
+                print(f"Write-behind row failed: {e}")
+                failed.append(index)
+        return done, failed, []
+
+    def _requeue_history(self, failed: List[Dict[str, Any]], unreachable: List[Dict[str, Any]]) -> None:
+        """Queue history rows for the next flush; failed rows out of attempts are dropped"""
+        retry = []
+        for row in failed:
+            attempts = row.get(ATTEMPTS, 0) + 1
+            if attempts >= self.max_attempts:
+                self.poisoned += 1
+                print(f"✗ Write-behind dropped advice_history row for farm {row['farm_id']} after {attempts} failed attempts")
+                continue
+            retry.append({**row, ATTEMPTS: attempts})
+        retry.extend(unreachable)
+        keep = max(0, self.max_pending - self.pending())
+        self.dropped += max(0, len(retry) - keep)
+        self._history[:0] = retry[:keep]
+
+    def _requeue_states(self, states: Dict[int, Dict[str, Any]], failed: List[int], unreachable: List[int]) -> None:
+        """Queue state updates for the next flush (newer updates win); failed rows out of attempts are dropped"""
+        retry = list(unreachable)
+        for state_id in failed:
+            attempts = self._state_attempts.get(state_id, 0) + 1
+            if attempts >= self.max_attempts:
+                self.poisoned += 1
+                self._state_attempts.pop(state_id, None)
+                self._states.pop(state_id, None)
+                print(f"✗ Write-behind dropped farm_states update for id {state_id} after {attempts} failed attempts")
+                continue
+            self._state_attempts[state_id] = attempts
+            retry.append(state_id)
+        for state_id in retry:
+            self._states[state_id] = {**states[state_id], **self._states.get(state_id, {})}
+
+    async def _run(self) -> None:
+        """Periodic flush loop"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the periodic flush loop (call from a running event loop)"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write whatever is still queued"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+        await self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        """Queue and flush counters for diagnostics"""
+        return {
+            "pending_history": len(self._history),
+            "pending_states": len(self._states),
+            "flushed_history": self.flushed_history,
+            "flushed_states": self.flushed_states,
+            "collapsed": self.collapsed,
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "poisoned": self.poisoned
+        }
+
+
+# Singleton instance
+_write_buffer: Optional[WriteBehindBuffer] = None
+
+
+def get_write_buffer() -> WriteBehindBuffer:
+    """
+    Get singleton write-behind buffer instance.
+
+    Returns:
+        WriteBehindBuffer instance
+    """
+    global _write_buffer
+    if _write_buffer is None:
+        _write_buffer = WriteBehindBuffer()
+    return _write_buffer